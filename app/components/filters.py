@@ -0,0 +1,122 @@
+import numpy as np
+import streamlit as st
+
+from components import perf
+from data.bitmaps import load_bitmaps
+
+
+class Filters:
+    """The sidebar selections and the rows of the dataset they keep.
+
+    key is hashable and empty when nothing is filtered, so it can go into figure
+    cache keys without splitting the unfiltered entries.
+    """
+
+    def __init__(self, selections, mask):
+        self.selections = selections
+        self.positions = None if mask is None else np.flatnonzero(mask)
+        self.key = tuple(
+            (name, tuple(values))
+            for name, values in selections.items()
+            if values is not None
+        )
+
+    @property
+    def where(self):
+        """The selections in the form AggregateCube.agg(where=...) takes."""
+        return {
+            name: values
+            for name, values in self.selections.items()
+            if values is not None
+        }
+
+    def apply(self, frame):
+        """The filtered rows of frame, which must be in dataset order (mpg_view())."""
+        return frame if self.positions is None else frame.iloc[self.positions]
+
+    def ordering(self, load):
+        """Wrap load(column), a sort order of the whole dataset, for filtered frames."""
+        if self.positions is None:
+            return load
+
+        def ordering(column):
+            order = load(column)
+            rank = np.full(len(order), -1)
+            rank[self.positions] = np.arange(len(self.positions))
+            order = rank[order]
+            return order[order >= 0]
+
+        return ordering
+
+
+def _remembered(key, default, options):
+    """Give the widget key its value from the last page that showed it.
+
+    Streamlit drops a widget's state on pages that don't render it, so the
+    selections are also kept under "filters", which survives page switches.
+    """
+    stored = st.session_state.setdefault("filters", {})
+    if key not in st.session_state:
+        value = stored.get(key)
+        if value is None:
+            value = default
+        elif isinstance(value, list):
+            value = [v for v in value if v in options]
+        else:
+            # A range: clamped to the options, which may have changed since
+            low, high = value
+            value = (max(low, options[0]), min(high, options[-1]))
+            if value[0] > value[1]:
+                value = default
+        st.session_state[key] = value
+    return stored
+
+
+def _multiselect(label, name, options):
+    key = f"filter_{name}"
+    stored = _remembered(key, [], options)
+    stored[key] = st.multiselect(label, options, placeholder="All", key=key)
+    return stored[key] or None
+
+
+def _year_range(years):
+    key = "filter_model_year"
+    stored = _remembered(key, (years[0], years[-1]), years)
+    low, high = st.slider(
+        "Model year", min_value=years[0], max_value=years[-1], key=key
+    )
+    if (low, high) == (years[0], years[-1]):
+        # Unfiltered is stored as None, so it stays so when the years change
+        stored[key] = None
+        return None
+    stored[key] = (low, high)
+    return [year for year in years if low <= year <= high]
+
+
+def sidebar_filters():
+    """Origin, model year, cylinders and company filters shared by every page.
+
+    Stops the page with a message when no rows match.
+    """
+    with perf.section("filters", "filter"):
+        bitmaps = load_bitmaps()
+        with st.sidebar:
+            st.markdown("### Filters")
+            selections = {
+                "origin": _multiselect("Origin", "origin", bitmaps.values("origin")),
+                "model_year": _year_range(bitmaps.values("model_year")),
+                "cylinders": _multiselect(
+                    "Cylinders", "cylinders", bitmaps.values("cylinders")
+                ),
+                "company": _multiselect(
+                    "Company", "company", bitmaps.values("company")
+                ),
+            }
+            filters = Filters(selections, bitmaps.mask(selections))
+            if filters.positions is not None:
+                st.caption(f"{len(filters.positions):,} of {bitmaps.rows:,} rows")
+    if filters.positions is not None and len(filters.positions) == 0:
+        st.info("No cars match the filters in the sidebar.")
+        perf.finish_page()
+        st.stop()
+    return filters
@@ -0,0 +1,82 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+from components.lazy import lazy_section
+
+logger = logging.getLogger(__name__)
+
+# Gallery images are sent as WebP thumbnails of THUMBNAIL_WIDTH pixels, cached in
+# memory and on disk under .thumbnails/ next to the source, keyed by its content.
+THUMBNAIL_WIDTH = int(os.environ.get("MPG_THUMBNAIL_WIDTH", 640))
+THUMBNAIL_QUALITY = 80
+
+_lock = threading.Lock()
+_thumbnails = {}
+
+
+def _build_thumbnail(path, width):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, image.height))
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=THUMBNAIL_QUALITY, method=6)
+    return buffer.getvalue()
+
+
+def thumbnail(path, width=THUMBNAIL_WIDTH):
+    """WebP bytes of the image at path, at most width pixels wide.
+
+    Built once per source content and width, then served from memory.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    key = (path, stat.st_size, stat.st_mtime_ns, width)
+    with _lock:
+        if key in _thumbnails:
+            return _thumbnails[key]
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    cached = path.parent / ".thumbnails" / f"{path.stem}-{digest}-{width}.webp"
+    if cached.exists():
+        data = cached.read_bytes()
+    else:
+        data = _build_thumbnail(path, width)
+        try:
+            cached.parent.mkdir(exist_ok=True)
+            partial = cached.with_suffix(f".{uuid.uuid4().hex}.partial")
+            partial.write_bytes(data)
+            os.replace(partial, cached)
+        except OSError as error:
+            logger.warning("thumbnail %s not cached on disk (%s)", cached, error)
+    with _lock:
+        _thumbnails[key] = data
+    return data
+
+
+def gallery(columns, key):
+    """st.image thumbnails of [[(path, caption), ...], ...], one list per column.
+
+    The full-size files are only sent from the section below the gallery, for
+    the image picked there.
+    """
+    for column, images in zip(st.columns(len(columns)), columns):
+        with column:
+            for path, caption in images:
+                st.image(thumbnail(path), caption=caption)
+
+    captions = {caption: path for images in columns for path, caption in images}
+
+    def full_size():
+        caption = st.selectbox("Image", list(captions), key=f"{key}_image")
+        st.image(captions[caption], caption=caption)
+
+    lazy_section("Full-size images", full_size, key=f"{key}_full_size")
@@ -0,0 +1,34 @@
+import streamlit as st
+
+
+def lazy_tabs(labels, render, key):
+    """st.tabs, except only the selected tab's render(label) runs.
+
+    The tab bar and its content are a fragment, so switching tabs reruns just
+    this section instead of the whole page.
+    """
+
+    @st.fragment
+    def tabs():
+        selected = st.radio(
+            key, labels, key=key, horizontal=True, label_visibility="collapsed"
+        )
+        render(selected)
+
+    tabs()
+
+
+def lazy_section(label, render, key):
+    """A collapsed section whose render() only runs once the user opens it.
+
+    Stands in for st.popover/st.expander, which build their content on every
+    rerun even while closed. Opening or closing it reruns just this section.
+    """
+
+    @st.fragment
+    def section():
+        if st.toggle(label, key=key):
+            with st.container(border=True):
+                render()
+
+    section()
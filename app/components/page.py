@@ -0,0 +1,111 @@
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from components import perf
+from data.dataframe import is_retired, latest_data_path, pin_data_path
+from data.refresh import start_refresher
+
+_pending = threading.local()
+_import = builtins.__import__
+
+
+def _timed_import(name, *args, **kwargs):
+    """builtins.__import__, timing each top-level import of a module not yet loaded.
+
+    Imports run inside another import are part of its time, not recorded twice.
+    """
+    if name in sys.modules or getattr(_pending, "depth", 0):
+        return _import(name, *args, **kwargs)
+    _pending.depth = 1
+    started = time.perf_counter()
+    try:
+        return _import(name, *args, **kwargs)
+    finally:
+        _pending.depth = 0
+        imports = getattr(_pending, "imports", None)
+        if imports is None:
+            imports = _pending.imports = []
+        imports.append((name, time.perf_counter() - started))
+
+
+if perf.active() and builtins.__import__ is _import:
+    builtins.__import__ = _timed_import
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is first used.
+
+    Pages import heavy modules this way so a cold worker only pays for them once
+    a figure that needs them is built, not when a cached one is served.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = sys.modules.get(name)
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            if self._name in sys.modules:
+                self._module = sys.modules[self._name]
+            else:
+                with perf.section(f"import {self._name}", "import"):
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def _session_data_path():
+    """The dataset the session's last full run used, for its fragment reruns.
+
+    A fragment closes over frames and row positions from that run, so once the
+    dataset is retired or gone it can't switch to the latest one by itself: the
+    whole page is rerun instead.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    path = st.session_state.get("data_path")
+    if path is None:
+        return None
+    if is_retired(path) or not os.path.exists(path):
+        if ctx.fragment_ids_this_run:
+            st.rerun(scope="app")
+        return None
+    return path
+
+
+pin_data_path(_session_data_path)
+
+
+def setup_page(title, icon, code_toggle=True):
+    """Start a page: set_page_config, its perf record and the "Show Code" toggle.
+
+    Modules the page imported on this rerun are recorded as "import" sections.
+    The session moves to the latest dataset here, and only here.
+    """
+    st.set_page_config(page_title=title, page_icon=icon, layout="wide")
+    start_refresher()
+    st.session_state["data_path"] = str(latest_data_path())
+    perf.start_page(title)
+    for name, seconds in getattr(_pending, "imports", None) or []:
+        perf.add_section(f"import {name}", "import", seconds)
+    _pending.imports = []
+    if code_toggle:
+        with st.sidebar:
+            st.session_state.expand_code = st.toggle("Show Code")
+
+
+def show_code(lines_of_code):
+    expanded = st.session_state.get("expand_code", False)
+    with st.expander("See Python Code", expanded=expanded):
+        st.code(lines_of_code, language="python")
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+import plotly.io as pio
+import pyarrow as pa
+import streamlit as st
+
+# MPG_PERF=1 adds the sidebar panel; MPG_PERF_LOG=path appends every measured
+# section to that file as a JSON line. With neither set only wall time is taken.
+# Peak memory comes from tracemalloc, which slows Python down noticeably, so
+# MPG_PERF_MEMORY=0 turns it off when the timings themselves matter.
+PERF_PANEL = os.environ.get("MPG_PERF", "") not in ("", "0")
+PERF_LOG = os.environ.get("MPG_PERF_LOG")
+PERF_MEMORY = os.environ.get("MPG_PERF_MEMORY", "1") != "0"
+
+_log_lock = threading.Lock()
+
+
+def active():
+    return PERF_PANEL or bool(PERF_LOG)
+
+
+def _run():
+    try:
+        return st.session_state.get("perf_run")
+    except Exception:
+        return None
+
+
+def start_page(page):
+    """Open this rerun's record; call once at the top of every instrumented page."""
+    run = {
+        "page": page,
+        "run": uuid.uuid4().hex[:12],
+        "started": time.time(),
+        "sections": [],
+    }
+    if active() and PERF_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    st.session_state.perf_run = run
+    return run
+
+
+def _write(event):
+    if not PERF_LOG:
+        return
+    with _log_lock, open(PERF_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, default=str) + "\n")
+
+
+def _append(record):
+    run = _run()
+    if run is not None:
+        run["sections"].append(record)
+        _write({"page": run["page"], "run": run["run"], **record})
+
+
+@contextmanager
+def section(name, kind="section"):
+    """Time the block as one named section of the current rerun.
+
+    Yields the section's record, so callers can add fields such as "bytes".
+    """
+    record = {"section": name, "kind": kind}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - started
+        if tracing:
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        _append(record)
+
+
+def add_section(name, kind, seconds):
+    """Add a section measured elsewhere, such as an import, to the current rerun."""
+    _append({"section": name, "kind": kind, "seconds": seconds})
+
+
+def plotly_chart(fig, name, container=None, **kwargs):
+    with section(name, "chart") as record:
+        if active():
+            record["bytes"] = len(pio.to_json(fig, validate=False))
+        return (container or st).plotly_chart(fig, **kwargs)
+
+
+def _arrow_bytes(data):
+    if isinstance(data, pa.Table):
+        return data.nbytes
+    data = getattr(data, "data", data)  # a Styler's frame
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    return pa.Table.from_pandas(data).nbytes
+
+
+def dataframe(data, name, container=None, **kwargs):
+    with section(name, "table") as record:
+        if active():
+            record["bytes"] = _arrow_bytes(data)
+        return (container or st).dataframe(data, **kwargs)
+
+
+def finish_page():
+    """Log the rerun total and, with MPG_PERF=1, show the sidebar debug panel."""
+    run = _run()
+    if run is None:
+        return
+    total = {"section": "rerun", "kind": "total"}
+    total["seconds"] = time.time() - run["started"]
+    if tracemalloc.is_tracing():
+        total["peak_bytes"] = max(
+            [s.get("peak_bytes", 0) for s in run["sections"]]
+            + [tracemalloc.get_traced_memory()[1]]
+        )
+    _write({"page": run["page"], "run": run["run"], **total})
+    if not PERF_PANEL:
+        return
+
+    from figures.cache import figure_cache
+
+    with st.sidebar:
+        if st.toggle("Performance panel", key="perf_panel"):
+            st.caption(f'{run["page"]}: {total["seconds"] * 1000:.0f} ms')
+            sections = pd.DataFrame(run["sections"] + [total])
+            sections["ms"] = sections.pop("seconds") * 1000
+            columns = ["section", "kind", "ms", "bytes", "peak_bytes"]
+            st.dataframe(sections.reindex(columns=columns), hide_index=True)
+            st.json(figure_cache.stats())
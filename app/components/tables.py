@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components import perf
+
+HIGHLIGHT = "background-color: lightgreen; color: black"
+# Rows sent per table page; styling costs Python per cell, so it must stay
+# bounded however many rows a filter matches.
+TABLE_ROWS = int(os.environ.get("MPG_TABLE_ROWS", 200))
+
+
+def highlight_styles(frame, columns, css=HIGHLIGHT):
+    """A frame of CSS strings with whole columns highlighted, built in one step."""
+    positions = frame.columns.get_indexer(list(columns))
+    if (positions < 0).any():
+        # get_indexer gives -1 for these, which would highlight the last column
+        missing = [c for c, i in zip(columns, positions) if i < 0]
+        raise KeyError(f"columns not in the frame: {missing}")
+    styles = np.full(frame.shape, "", dtype=object)
+    styles[:, positions] = css
+    return pd.DataFrame(styles, index=frame.index, columns=frame.columns)
+
+
+def sort_positions(data, positions, column, ordering=None):
+    """positions reordered by data[column], ties kept in their current order.
+
+    ordering(column) may return a stable argsort of all of data, such as
+    data.orderings.load_ordering; the result is then picked out of it in one
+    pass instead of sorting it.
+    """
+    if ordering is not None:
+        order = ordering(column)
+        member = np.zeros(len(data), dtype=bool)
+        member[positions] = True
+        return order[member[order]]
+    values = data[column].iloc[positions].reset_index(drop=True)
+    return positions[values.sort_values(kind="stable").index.to_numpy()]
+
+
+def paginated_table(
+    data,
+    name,
+    key,
+    positions=None,
+    highlight=(),
+    css=HIGHLIGHT,
+    ordering=None,
+    page_size=TABLE_ROWS,
+):
+    """st.dataframe of data.iloc[positions], one page of page_size rows at a time.
+
+    The result stays on the server as an array of row positions, and only the
+    page on show is styled (highlight columns get css) and sent. Results longer
+    than a page get sort and page controls; see sort_positions for ordering.
+    """
+    positions = np.arange(len(data)) if positions is None else np.asarray(positions)
+    total = len(positions)
+    caption = f"{total:,} rows"
+    if total > page_size:
+        pages = -(-total // page_size)
+        page_key = f"{key}_page"
+        if st.session_state.get(page_key, 1) > pages:
+            st.session_state[page_key] = pages
+        sort_col, order_col, page_col = st.columns(3)
+        sort_by = sort_col.selectbox(
+            "Sort by",
+            [None, *data.columns],
+            format_func=lambda column: "row order" if column is None else column,
+            key=f"{key}_sort",
+        )
+        descending = order_col.toggle("Descending", key=f"{key}_descending")
+        page = page_col.number_input(
+            f"Page (of {pages:,})", min_value=1, max_value=pages, key=page_key
+        )
+        if sort_by is not None:
+            with perf.section(f"sort {name}", "sort"):
+                positions = sort_positions(data, positions, sort_by, ordering)
+        if descending:
+            positions = positions[::-1]
+        start = (page - 1) * page_size
+        positions = positions[start : start + page_size]
+        caption += f", showing {start + 1:,} to {start + len(positions):,}"
+
+    rows = data.iloc[positions]
+    if len(highlight):
+        rows = rows.style.apply(highlight_styles, axis=None, columns=highlight, css=css)
+    perf.dataframe(rows, name)
+    st.caption(caption)
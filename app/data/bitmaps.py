@@ -0,0 +1,62 @@
+import numpy as np
+
+from data.dataframe import dataset_cache
+from data.derived import mpg_view
+
+FILTER_COLUMNS = ["origin", "model_year", "cylinders", "company"]
+
+
+class BitmapIndex:
+    """One packed bitmap of matching rows per value of each filter column.
+
+    A filter is answered by OR-ing the bitmaps of the values it allows within a
+    column and AND-ing across columns, eight rows per byte, without touching the
+    frame itself.
+    """
+
+    def __init__(self, rows, bitmaps):
+        self.rows = rows
+        self.bitmaps = bitmaps
+
+    @classmethod
+    def build(cls, mpg_data, columns=None):
+        bitmaps = {}
+        for name in columns or FILTER_COLUMNS:
+            codes, uniques = mpg_data[name].factorize(sort=True)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            bitmaps[name] = {}
+            for code, value in enumerate(uniques.tolist()):
+                bits = np.zeros(len(mpg_data), dtype=bool)
+                bits[order[bounds[code] : bounds[code + 1]]] = True
+                bitmaps[name][value] = np.packbits(bits)
+        return cls(len(mpg_data), bitmaps)
+
+    def values(self, column):
+        return list(self.bitmaps[column])
+
+    def mask(self, selections):
+        """Boolean mask of the rows matching {column: allowed values}, or None for all.
+
+        Columns left out, or given None, are not filtered.
+        """
+        packed = None
+        for name, allowed in selections.items():
+            if allowed is None:
+                continue
+            column = self.bitmaps[name]
+            selected = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+            for value in allowed:
+                if value in column:
+                    selected |= column[value]
+            packed = selected if packed is None else packed & selected
+        if packed is None:
+            return None
+        return np.unpackbits(packed, count=self.rows).view(bool)
+
+
+def load_bitmaps(path=None):
+    """The bitmap index of the filter columns, built once per dataset version."""
+    return dataset_cache(
+        "bitmaps", lambda p: BitmapIndex.build(mpg_view("company", path=p)), path
+    )
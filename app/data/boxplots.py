@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from data.dataframe import dataset_cache
+from data.derived import mpg_view
+
+BOX_GROUPS = ["cylinders", "origin", "model_year"]
+BOX_COLUMNS = ["mpg", "horsepower", "acceleration", "weight", "displacement"]
+
+
+class BoxStats:
+    """Quartiles, whiskers and outliers of a column per group.
+
+    stats has a row per group, in sorted group order, with the columns go.Box
+    takes precomputed (q1, median, q3, lowerfence, upperfence, mean) and the
+    number of values n. outliers holds the positions of the rows outside the
+    whiskers, in row order, outlier_groups the group of each and outlier_high
+    whether it is above the box rather than below. Without by, there is one group,
+    None.
+
+    Whiskers reach the furthest values within 1.5 IQR of the quartiles, and
+    quartiles are interpolated linearly, as pandas' quantile does.
+    """
+
+    def __init__(self, column, by, stats, outliers, outlier_groups, outlier_high):
+        self.column = column
+        self.by = by
+        self.stats = stats
+        self.outliers = outliers
+        self.outlier_groups = outlier_groups
+        self.outlier_high = outlier_high
+
+    @classmethod
+    def build(cls, data_frame, column, by):
+        values = data_frame[column].to_numpy(dtype="float64", na_value=np.nan)
+        if by is None:
+            codes, groups = np.zeros(len(values), dtype="intp"), pd.Index([None])
+        else:
+            codes, groups = pd.factorize(data_frame[by], sort=True)
+        valid = np.flatnonzero(~np.isnan(values) & (codes >= 0))
+        if len(valid) == 0:
+            stats = pd.DataFrame(
+                columns=["q1", "median", "q3", "lowerfence", "upperfence", "mean", "n"],
+                index=pd.Index([], name=by),
+                dtype="float64",
+            )
+            empty = np.array([], dtype="intp")
+            return cls(column, by, stats, empty, empty, np.array([], dtype=bool))
+        # One sort by (group, value) gives every group's order statistics
+        order = valid[np.lexsort((values[valid], codes[valid]))]
+        ordered, ordered_codes = values[order], codes[order]
+        n = np.bincount(ordered_codes, minlength=len(groups))
+        present = np.flatnonzero(n)
+        n = n[present]
+        starts = np.concatenate([[0], np.cumsum(n)[:-1]])
+
+        def quantile(q):
+            position = starts + (n - 1) * q
+            low = np.floor(position).astype("intp")
+            high = np.ceil(position).astype("intp")
+            return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+        q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+        iqr = q3 - q1
+        group = np.repeat(np.arange(len(present)), n)
+        inside = (ordered >= (q1 - 1.5 * iqr)[group]) & (
+            ordered <= (q3 + 1.5 * iqr)[group]
+        )
+        # The median is always inside, so every group has a whisker at each end
+        stats = pd.DataFrame(
+            {
+                "q1": q1,
+                "median": median,
+                "q3": q3,
+                "lowerfence": np.minimum.reduceat(
+                    np.where(inside, ordered, np.inf), starts
+                ),
+                "upperfence": np.maximum.reduceat(
+                    np.where(inside, ordered, -np.inf), starts
+                ),
+                "mean": np.add.reduceat(ordered, starts) / n,
+                "n": n,
+            },
+            index=pd.Index(groups[present], name=by),
+        )
+        outliers = order[~inside]
+        sort = np.argsort(outliers, kind="stable")
+        outlier_groups = np.asarray(groups[present][group[~inside][sort]])
+        outlier_high = (ordered[~inside] > median[group[~inside]])[sort]
+        return cls(column, by, stats, outliers[sort], outlier_groups, outlier_high)
+
+    def outliers_in(self, group, high=None):
+        """Positions of the outliers of group, or of those above (high=True) or
+        below (high=False) its box."""
+        selected = self.outlier_groups == group
+        if high is not None:
+            selected &= self.outlier_high == high
+        return self.outliers[selected]
+
+
+def load_box_stats(column, by, path=None):
+    """BoxStats of column per by over the whole dataset, once per dataset version."""
+    return dataset_cache(
+        ("box_stats", column, by),
+        lambda p: BoxStats.build(mpg_view(path=p), column, by),
+        path,
+    )
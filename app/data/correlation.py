@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from data.dataframe import data_path, dataset_cache, drop_missing, load_mpg_data
+from data.schema import apply_schema
+from data.streaming import DEFAULT_CHUNKSIZE, QUANTILE_SAMPLE_SIZE, load_mpg_summary
+
+CORRELATION_METHODS = ["pearson", "spearman"]
+
+
+class CoMoments:
+    """Mergeable count, means and co-moment matrix of a set of numeric columns.
+
+    Chunks can be added in any order and partial results from different
+    partitions merged, and the covariance and Pearson matrices come out the same
+    as from the concatenated rows. Rows with a missing value in any of the
+    columns are left out.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+
+    def update(self, values):
+        if isinstance(values, pd.DataFrame):
+            values = values[self.columns].to_numpy(dtype="float64")
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return self
+        other = CoMoments(self.columns)
+        other.count = len(values)
+        other.mean = values.mean(axis=0)
+        centered = values - other.mean
+        other.comoment = centered.T @ centered
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = (
+            self.comoment
+            + other.comoment
+            + np.outer(delta, delta) * self.count * other.count / count
+        )
+        self.mean = self.mean + delta * other.count / count
+        self.count = count
+        return self
+
+    def covariance(self):
+        cov = (
+            self.comoment / (self.count - 1)
+            if self.count > 1
+            else self.comoment * np.nan
+        )
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def approximate_ranks(values, sample):
+    """Mid-ranks of values, as fractions, within a uniform sample of the column.
+
+    Exact (up to scale) when the sample is the whole column. Pearson of these
+    ranks is Spearman's rho, approximated by how well the sample covers the data.
+    """
+    sample = np.sort(sample)
+    values = np.asarray(values, dtype="float64")
+    left = np.searchsorted(sample, values, side="left")
+    right = np.searchsorted(sample, values, side="right")
+    ranks = (left + right) / (2 * len(sample))
+    return np.where(np.isnan(values), np.nan, ranks)
+
+
+def _rank_chunk(chunk, samples):
+    return np.column_stack(
+        [approximate_ranks(chunk[name], sample) for name, sample in samples.items()]
+    )
+
+
+def correlation_matrix(
+    frame,
+    method="pearson",
+    columns=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sample_size=QUANTILE_SAMPLE_SIZE,
+):
+    """frame[columns].corr(method), accumulated chunksize rows at a time.
+
+    Spearman ranks against a sample of sample_size values per column, so its
+    cost stays linear in the rows.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"unknown correlation method {method!r}")
+    columns = list(columns or frame.select_dtypes("number").columns)
+    moments = CoMoments(columns)
+    if method == "spearman":
+        rng = np.random.default_rng(0)
+        samples = {}
+        for name in columns:
+            values = frame[name].dropna().to_numpy(dtype="float64")
+            if len(values) > sample_size:
+                values = rng.choice(values, sample_size, replace=False)
+            samples[name] = values
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start : start + chunksize]
+        moments.update(
+            _rank_chunk(chunk, samples) if method == "spearman" else chunk[columns]
+        )
+    return moments.correlation()
+
+
+def stream_correlation(path=None, method="pearson", chunksize=DEFAULT_CHUNKSIZE):
+    """The cleaned csv's correlation matrix without loading all of it.
+
+    Spearman takes its rank samples from the streamed summary
+    (data.streaming.load_mpg_summary), so it reads the csv at most twice.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"unknown correlation method {method!r}")
+    # The numeric columns come from the header and the schema, so a csv without
+    # rows still gives the full (all NaN) matrix
+    header = apply_schema(drop_missing(pd.read_csv(data_path(path), nrows=0)))
+    moments = CoMoments(header.select_dtypes("number").columns)
+    if method == "spearman":
+        stats = load_mpg_summary(path).stats
+        samples = {
+            name: stats[name].sample if name in stats else np.array([])
+            for name in moments.columns
+        }
+    with pd.read_csv(data_path(path), chunksize=chunksize) as chunks:
+        for raw in chunks:
+            clean = drop_missing(raw)
+            moments.update(
+                _rank_chunk(clean, samples) if method == "spearman" else clean
+            )
+    return moments.correlation()
+
+
+def load_correlation(method="pearson", path=None):
+    """Correlation of the cleaned dataset's numeric columns, once per dataset version."""
+    return dataset_cache(
+        ("correlation", method),
+        lambda p: correlation_matrix(load_mpg_data(p), method),
+        path,
+    )
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from data.dataframe import dataset_cache
+from data.derived import mpg_view
+
+CUBE_DIMENSIONS = ["model_year", "origin", "company", "cylinders"]
+CUBE_MEASURES = [
+    "mpg",
+    "cylinders",
+    "displacement",
+    "horsepower",
+    "weight",
+    "acceleration",
+]
+
+
+class AggregateCube:
+    """count, sum, sum of squares, min and max of every measure per dimension cell.
+
+    Any groupby over a subset of CUBE_DIMENSIONS that asks for count, sum, mean,
+    var, std, min or max can be answered by rolling up the cells, whose number is
+    bounded by the distinct dimension values rather than by the rows.
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    @classmethod
+    def build(cls, mpg_data):
+        measures = mpg_data[CUBE_MEASURES].astype("float64")
+        columns = {"count": pd.Series(1, index=mpg_data.index)}
+        how = {"count": "sum"}
+        for name in CUBE_MEASURES:
+            columns[f"{name}_sum"] = measures[name]
+            columns[f"{name}_sumsq"] = measures[name] ** 2
+            columns[f"{name}_min"] = measures[name]
+            columns[f"{name}_max"] = measures[name]
+            how.update(
+                {
+                    f"{name}_sum": "sum",
+                    f"{name}_sumsq": "sum",
+                    f"{name}_min": "min",
+                    f"{name}_max": "max",
+                }
+            )
+        rows = pd.DataFrame(columns).join(mpg_data[CUBE_DIMENSIONS].add_prefix("dim_"))
+        grouped = rows.groupby(
+            [f"dim_{name}" for name in CUBE_DIMENSIONS], observed=True
+        )
+        cells = grouped.agg(how)
+        cells.index.names = CUBE_DIMENSIONS
+        return cls(cells.reset_index())
+
+    def slice(self, where=None):
+        """Cells whose dimensions take one of the allowed values, e.g. {"origin": ["japan"]}."""
+        cells = self.cells
+        for name, values in (where or {}).items():
+            cells = cells[cells[name].isin(list(values))]
+        return cells
+
+    def agg(self, by, where=None, **named):
+        """Like groupby(by).agg(name=(measure, func)) on the rows the cube was built from."""
+        by = [by] if isinstance(by, str) else list(by)
+        grouped = self.slice(where).groupby(by, observed=True)
+        totals = grouped.sum(numeric_only=True)
+        result = pd.DataFrame(index=totals.index)
+        for name, (measure, func) in named.items():
+            count = totals["count"]
+            total = totals[f"{measure}_sum"]
+            if func == "count":
+                result[name] = count
+            elif func == "sum":
+                result[name] = total
+            elif func == "mean":
+                result[name] = total / count
+            elif func in ("var", "std"):
+                var = (totals[f"{measure}_sumsq"] - total**2 / count) / (count - 1)
+                var = var.clip(lower=0).where(count > 1)
+                result[name] = np.sqrt(var) if func == "std" else var
+            elif func == "min":
+                result[name] = grouped[f"{measure}_min"].min()
+            elif func == "max":
+                result[name] = grouped[f"{measure}_max"].max()
+            else:
+                raise ValueError(f"the cube can't compute {func!r}")
+        return result
+
+
+def load_cube(path=None):
+    """The aggregate cube of the cleaned dataset, built once per dataset version."""
+    return dataset_cache(
+        "cube", lambda p: AggregateCube.build(mpg_view("company", path=p)), path
+    )
@@ -1,7 +1,209 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
 import pandas as pd
 
-mpg_data = pd.read_csv(
-    "https://raw.githubusercontent.com/mwaskom/seaborn-data/refs/heads/master/mpg.csv"
-)
-mpg_data.dropna(inplace=True)
-mpg_data["horsepower"] = pd.to_numeric(mpg_data["horsepower"])
+from data.schema import apply_schema, memory_report
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "mpg.csv"
+DATA_PATH_ENV = "MPG_DATA_PATH"
+
+_lock = threading.RLock()
+_versions = {}
+_cache = {}
+_building = {}
+_latest = None
+_pinned = None
+_retire_hooks = []
+_retired = set()
+
+
+def latest_data_path():
+    """The newest dataset: the last one refreshed in, $MPG_DATA_PATH, then the bundled csv.
+
+    A refreshed file deleted under this process (another worker cleaned it up)
+    is skipped until the next refresh swaps in a newer one.
+    """
+    if _latest is not None and _latest.exists():
+        return _latest
+    return Path(os.environ.get(DATA_PATH_ENV) or BUNDLED_DATA_PATH).resolve()
+
+
+def data_path(path=None):
+    """Resolve the dataset path: explicit argument, the pinned one, then latest_data_path()."""
+    if path is None and _pinned is not None:
+        path = _pinned()
+    if path is None:
+        return latest_data_path()
+    return Path(path).resolve()
+
+
+def is_retired(path):
+    """Whether retire_version() has dropped path's caches since it was last swapped in."""
+    return Path(path).resolve() in _retired
+
+
+def pin_data_path(resolve):
+    """Have data_path() use resolve() first, unless it returns None.
+
+    Pages pin each session to the dataset its last full run used, so a version
+    swapped in by data.refresh never mixes with an older one in the same session.
+    """
+    global _pinned
+    _pinned = resolve
+
+
+def dataset_version(path=None):
+    """Content hash of the dataset file, recomputed only when its size or mtime changes.
+
+    Files swapped in by data.refresh keep the version parsed from their source.
+    """
+    path = data_path(path)
+    stat = path.stat()
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        if key in _versions:
+            return _versions[key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    version = digest.hexdigest()[:16]
+    with _lock:
+        _versions[key] = version
+    return version
+
+
+def swap_data_path(path, version=None):
+    """Make path the latest dataset, optionally with its version already known.
+
+    The swap is one assignment, so every caller sees either the old dataset or
+    the new one. Returns the previous (path, version).
+    """
+    global _latest
+    path = Path(path).resolve()
+    previous = latest_data_path()
+    previous_version = dataset_version(previous) if previous.exists() else None
+    with _lock:
+        if version is not None:
+            stat = path.stat()
+            _versions[(path, stat.st_size, stat.st_mtime_ns)] = version
+        _latest = path
+        _retired.discard(path)
+    return previous, previous_version
+
+
+def on_retire(hook):
+    """Call hook(version) when a dataset version is retired."""
+    _retire_hooks.append(hook)
+    return hook
+
+
+def retire_version(path, version):
+    """Drop every cached value built from version of path, and tell the on_retire hooks.
+
+    Pinned sessions are expected to stop using path (see pin_data_path).
+    """
+    path = Path(path).resolve()
+    with _lock:
+        _retired.add(path)
+        stale = [key for key in _cache if key[1:] == (path, version)]
+        for key in stale:
+            del _cache[key]
+    for hook in _retire_hooks:
+        hook(version)
+    logger.info("mpg data: retired %s (%d cached values)", version, len(stale))
+    return len(stale)
+
+
+def read_mpg_csv(path=None):
+    return pd.read_csv(data_path(path))
+
+
+def drop_missing(raw):
+    mpg_data = raw.dropna()
+    return mpg_data.assign(horsepower=pd.to_numeric(mpg_data["horsepower"]))
+
+
+def clean_mpg_data(raw):
+    mpg_data = drop_missing(raw)
+    compact = apply_schema(mpg_data)
+    total = memory_report(mpg_data, compact).loc["total"]
+    logger.info(
+        "mpg data: %d rows, %.1f MB -> %.1f MB after schema",
+        len(compact),
+        total["before"] / 1e6,
+        total["after"] / 1e6,
+    )
+    return compact
+
+
+def _read_only(column):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy().copy()
+        codes.flags.writeable = False
+        values = pd.Categorical.from_codes(codes, dtype=column.dtype)
+    else:
+        values = column.to_numpy().copy()
+        values.flags.writeable = False
+    return pd.Series(values, index=column.index, name=column.name, copy=False)
+
+
+def freeze(frame):
+    """Copy of frame whose values can't be written in place; shared frames go through this."""
+    return pd.DataFrame(
+        {name: _read_only(frame[name]) for name in frame.columns},
+        index=frame.index,
+        copy=False,
+    )
+
+
+def dataset_cache(kind, build, path=None):
+    """Process-wide cache of build(path), keyed by kind and the dataset version."""
+    path = data_path(path)
+    key = (kind, path, dataset_version(path))
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+        key_lock = _building.setdefault(key, threading.Lock())
+    with key_lock:
+        with _lock:
+            if key in _cache:
+                return _cache[key]
+        value = build(path)
+        with _lock:
+            _cache[key] = value
+            _building.pop(key, None)
+    return value
+
+
+def load_raw_mpg_data(path=None):
+    """The csv as shipped, missing values included; shared by every session in the process."""
+    return dataset_cache("raw", read_mpg_csv, path)
+
+
+def _load_clean(path):
+    # data.snapshot builds on this module, so it is imported here, not at the top
+    from data.snapshot import load_snapshot
+
+    snapshot = load_snapshot(path)
+    if snapshot is not None:
+        return snapshot
+    return freeze(clean_mpg_data(load_raw_mpg_data(path)))
+
+
+def load_mpg_data(path=None):
+    """The cleaned dataset, read-only and shared by every session in the process.
+
+    It is read from the memory-mapped snapshot (data.snapshot) when there is one.
+
+    Each call returns a shallow copy: the values are shared and can't be written,
+    and columns added to it never reach the cached frame. Pages should still work
+    on data.derived.mpg_view().
+    """
+    return dataset_cache("clean", _load_clean, path).copy(deep=False)
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from data.dataframe import dataset_cache, freeze, load_mpg_data
+from data.schema import MPG_SCHEMA
+
+DERIVED_COLUMNS = {}
+
+
+def derived_column(name):
+    """Register fn(mpg_data) -> Series as the way to compute column name."""
+
+    def register(fn):
+        DERIVED_COLUMNS[name] = fn
+        return fn
+
+    return register
+
+
+@derived_column("company")
+def company(mpg_data):
+    """First word of each car name, split once per distinct name rather than per row."""
+    names = mpg_data["name"].astype("category")
+    companies = names.cat.categories.str.split(" ").str[0]
+    return pd.Series(pd.Categorical(companies[names.cat.codes]), index=names.index)
+
+
+def _build(name, path):
+    column = DERIVED_COLUMNS[name](load_mpg_data(path)).rename(name)
+    if name in MPG_SCHEMA:
+        column = column.astype(MPG_SCHEMA[name])
+    return freeze(column.to_frame())[name]
+
+
+def derived(name, path=None):
+    """Derived column name, computed once per dataset version and shared read-only."""
+    if name not in DERIVED_COLUMNS:
+        raise KeyError(f"no derived column registered as {name!r}")
+    return dataset_cache(("derived", name), lambda p: _build(name, p), path)
+
+
+def mpg_view(*columns, path=None):
+    """The shared dataset plus the requested derived columns.
+
+    The view is a shallow copy, so it costs no copying of the data and adding or
+    replacing columns on it never reaches the frame other sessions are using.
+    """
+    view = load_mpg_data(path).copy(deep=False)
+    for name in columns:
+        view[name] = derived(name, path)
+    return view
@@ -0,0 +1,66 @@
+import numpy as np
+
+from data.dataframe import dataset_cache, load_mpg_data
+
+EXTREME_COLUMNS = [
+    "mpg",
+    "cylinders",
+    "displacement",
+    "horsepower",
+    "weight",
+    "acceleration",
+    "model_year",
+]
+TOP_K_MEASURES = ["mpg", "displacement", "horsepower", "weight", "acceleration"]
+
+
+class ExtremesIndex:
+    """Row positions of the extreme values of each column and of each group's top-k.
+
+    Positions are into the frame the index was built from, so look them up with
+    .iloc on that frame or on a view of it (data.derived.mpg_view).
+    """
+
+    def __init__(self, argmax, argmin, group_orders):
+        self.argmax = argmax
+        self.argmin = argmin
+        self.group_orders = group_orders
+
+    @classmethod
+    def build(cls, mpg_data, columns=None, measures=None, group_by="cylinders"):
+        argmax, argmin = {}, {}
+        for name in columns or EXTREME_COLUMNS:
+            values = mpg_data[name].to_numpy()
+            argmax[name] = np.flatnonzero(values == values.max())
+            argmin[name] = np.flatnonzero(values == values.min())
+
+        # Per measure: every row ordered by group, then by the measure descending,
+        # with ties kept in frame order. Any group's top-k is then a slice.
+        groups = mpg_data[group_by].to_numpy()
+        group_orders = {}
+        for name in measures or TOP_K_MEASURES:
+            order = np.lexsort((-mpg_data[name].to_numpy(), groups))
+            keys, starts = np.unique(groups[order], return_index=True)
+            ends = np.append(starts[1:], len(order))
+            group_orders[name] = (
+                order,
+                {key: (start, end) for key, start, end in zip(keys, starts, ends)},
+            )
+        return cls(argmax, argmin, group_orders)
+
+    def extremes(self, column, which="max"):
+        return (self.argmax if which == "max" else self.argmin)[column]
+
+    def top_k(self, group, measure, k=1):
+        order, bounds = self.group_orders[measure]
+        if group not in bounds:
+            return order[:0]
+        start, end = bounds[group]
+        return order[start : min(start + k, end)]
+
+
+def load_extremes(path=None):
+    """The extremes index of the cleaned dataset, built once per dataset version."""
+    return dataset_cache(
+        "extremes", lambda p: ExtremesIndex.build(load_mpg_data(p)), path
+    )
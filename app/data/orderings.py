@@ -0,0 +1,20 @@
+from data.dataframe import dataset_cache, load_mpg_data
+from data.derived import DERIVED_COLUMNS, derived
+
+
+def _build(column, path):
+    if column in DERIVED_COLUMNS:
+        values = derived(column, path)
+    else:
+        values = load_mpg_data(path)[column]
+    order = values.argsort(kind="stable").to_numpy()
+    order.setflags(write=False)
+    return order
+
+
+def load_ordering(column, path=None):
+    """Row positions of the dataset sorted by column, computed once per dataset version.
+
+    Derived columns are included, so the ordering applies to any mpg_view().
+    """
+    return dataset_cache(("ordering", column), lambda p: _build(column, p), path)
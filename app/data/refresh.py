@@ -0,0 +1,219 @@
+"""Background refresh of the dataset from a file, a directory or an HTTP URL.
+
+A thread polls $MPG_REFRESH_SOURCE every $MPG_REFRESH_INTERVAL seconds. A new
+version is copied to $MPG_REFRESH_DIR as mpg-<version>.csv, a file that is never
+written again, and swapped in as the latest dataset. The version before it stays
+for sessions still on it; the caches built from older versions are dropped, and
+nothing else.
+
+The version is parsed off the source's path (the URL after redirects, or the
+file name): the first run of characters in its last segment that starts with a
+digit, so .../mpg-2026-10-18T13.csv is version 2026-10-18T13. Sources without
+one are versioned by content hash.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from pathlib import Path, PurePosixPath
+
+from data.dataframe import (
+    BUNDLED_DATA_PATH,
+    dataset_version,
+    retire_version,
+    swap_data_path,
+)
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SOURCE = os.environ.get("MPG_REFRESH_SOURCE")
+REFRESH_INTERVAL = float(os.environ.get("MPG_REFRESH_INTERVAL", 300))
+REFRESH_DIR = os.environ.get("MPG_REFRESH_DIR")
+REFRESH_KEEP = float(os.environ.get("MPG_REFRESH_KEEP", 24 * 3600))
+REFRESH_TIMEOUT = 60
+
+VERSION_PATTERN = re.compile(r"\d[\w.-]*?(?=\.csv$|$)")
+
+
+def parse_version(path):
+    """The version in the last segment of a path or URL path, or None."""
+    name = PurePosixPath(urllib.parse.urlparse(str(path)).path).name
+    match = VERSION_PATTERN.search(name)
+    return match.group(0) if match else None
+
+
+def _is_url(source):
+    return urllib.parse.urlparse(str(source)).scheme in ("http", "https")
+
+
+class DatasetRefresher:
+    """Polls source for new versions of the dataset and swaps them in.
+
+    poll() does one check and returns the path of the version it swapped in, or
+    None. start() runs it every interval seconds on a daemon thread.
+    """
+
+    def __init__(self, source, interval=REFRESH_INTERVAL, directory=None):
+        self.source = source
+        self.interval = interval
+        directory = directory or REFRESH_DIR or BUNDLED_DATA_PATH.parent / ".refresh"
+        self.directory = Path(directory)
+        self.version = None
+        self.installed = []
+        self._seen = None
+        self._headers = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _target(self, version):
+        return self.directory / f"mpg-{version}.csv"
+
+    def _partial(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f".mpg-{uuid.uuid4().hex}.partial"
+
+    def _fetch_file(self):
+        source = Path(self.source)
+        if source.is_dir():
+            files = sorted(source.glob("*.csv"), key=lambda f: f.stat().st_mtime_ns)
+            if not files:
+                return None
+            source = files[-1]
+        stat = source.stat()
+        seen = (source, stat.st_size, stat.st_mtime_ns)
+        if seen == self._seen:
+            return None
+        self._seen = seen
+        version = parse_version(source.name) or dataset_version(source)
+        if version == self.version:
+            return None
+        partial = self._partial()
+        shutil.copyfile(source, partial)
+        return version, partial
+
+    def _fetch_url(self):
+        request = urllib.request.Request(self.source, headers=self._headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=REFRESH_TIMEOUT)
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                return None
+            raise
+        with response:
+            version = parse_version(response.geturl())
+            if version is not None and version == self.version:
+                return None
+            partial = self._partial()
+            digest = hashlib.sha256()
+            with open(partial, "wb") as f:
+                for block in iter(lambda: response.read(1 << 20), b""):
+                    digest.update(block)
+                    f.write(block)
+            self._headers = {
+                name: response.headers[header]
+                for name, header in (
+                    ("If-None-Match", "ETag"),
+                    ("If-Modified-Since", "Last-Modified"),
+                )
+                if response.headers.get(header)
+            }
+        version = version or digest.hexdigest()[:16]
+        if version == self.version:
+            partial.unlink()
+            return None
+        return version, partial
+
+    def poll(self):
+        """Check the source once; swap in and return the path of a new version."""
+        fetched = self._fetch_url() if _is_url(self.source) else self._fetch_file()
+        if fetched is None:
+            return None
+        version, partial = fetched
+        target = self._target(version)
+        if target.exists():
+            # Another worker got there first; replacing it would change its mtime
+            partial.unlink()
+        else:
+            os.replace(partial, target)
+        previous = swap_data_path(target, version)
+        logger.info("mpg data: refreshed to %s from %s", version, self.source)
+        self.version = version
+        if not self.installed and previous[1] not in (None, version):
+            # The dataset the process started on, so it is retired in turn too
+            self.installed.append(previous)
+        self.installed.append((target, version))
+        self._prune()
+        return target
+
+    def _prune(self):
+        """Retire all but the last two versions, then delete old downloads.
+
+        The one before the latest stays, caches included, for sessions still on it
+        until their next full rerun. Every worker shares the download directory and
+        may be behind this one, so files go only once they are REFRESH_KEEP
+        seconds old, and never the two this worker is using.
+        """
+        from data.snapshot import remove_snapshots
+
+        for path, version in self.installed[:-2]:
+            retire_version(path, version)
+        self.installed = self.installed[-2:]
+
+        in_use = {path.resolve() for path, _ in self.installed}
+        cutoff = time.time() - REFRESH_KEEP
+        for path in self.directory.glob("mpg-*.csv"):
+            try:
+                if path.resolve() in in_use or path.stat().st_mtime > cutoff:
+                    continue
+                remove_snapshots(path)
+                path.unlink(missing_ok=True)
+            except OSError as error:
+                logger.warning("mpg data: could not delete %s (%s)", path, error)
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("mpg data: refresh from %s failed", self.source)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="mpg-refresh", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher(source=None, interval=None):
+    """Start the process's refresher once, if a source is configured."""
+    global _refresher
+    source = source or REFRESH_SOURCE
+    if not source:
+        return None
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = DatasetRefresher(
+                source, REFRESH_INTERVAL if interval is None else interval
+            ).start()
+    return _refresher
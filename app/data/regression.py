@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+LOWESS_BINS = 100
+LOWESS_FRAC = 2 / 3
+
+
+def _group_codes(groups, n):
+    if groups is None:
+        return [None], np.zeros(n, dtype="intp")
+    groups = pd.Categorical(groups)
+    return list(groups.categories), groups.codes.astype("intp")
+
+
+def ols(x, y, groups=None):
+    """Least-squares y = intercept + slope * x for every group in one pass.
+
+    Returns a frame indexed by group (a single None row without groups) with
+    slope, intercept, r2, n and the range of x, x_min and x_max. Rows with a
+    missing x or y are left out.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    names, codes = _group_codes(groups, len(x))
+    keep = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+    x, y, codes = x[keep], y[keep], codes[keep]
+
+    def total(weights=None):
+        return np.bincount(codes, weights, minlength=len(names))
+
+    n = total()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x, mean_y = total(x) / n, total(y) / n
+        sxx = total(x * x) - n * mean_x**2
+        syy = total(y * y) - n * mean_y**2
+        sxy = total(x * y) - n * mean_x * mean_y
+        slope = sxy / sxx
+        r2 = sxy**2 / (sxx * syy)
+    x_min = np.full(len(names), np.inf)
+    x_max = np.full(len(names), -np.inf)
+    np.minimum.at(x_min, codes, x)
+    np.maximum.at(x_max, codes, x)
+    return pd.DataFrame(
+        {
+            "slope": slope,
+            "intercept": mean_y - slope * mean_x,
+            "r2": r2,
+            "n": n.astype("int64"),
+            "x_min": x_min,
+            "x_max": x_max,
+        },
+        index=pd.Index(names, name="group"),
+    )
+
+
+def _local_linear(centers, means, counts, frac):
+    """LOWESS over bin centres, each weighted by the rows it stands for."""
+    fitted = np.full(len(centers), np.nan)
+    span = min(max(int(np.ceil(frac * len(centers))), 2), len(centers))
+    for i, center in enumerate(centers):
+        distance = np.abs(centers - center)
+        radius = np.partition(distance, span - 1)[span - 1] or 1.0
+        weights = counts * np.clip(1 - (distance / radius) ** 3, 0, None) ** 3
+        total = weights.sum()
+        mean_x = (weights * centers).sum() / total
+        mean_y = (weights * means).sum() / total
+        sxx = (weights * (centers - mean_x) ** 2).sum()
+        slope = (
+            (weights * (centers - mean_x) * (means - mean_y)).sum() / sxx if sxx else 0
+        )
+        fitted[i] = mean_y + slope * (center - mean_x)
+    return fitted
+
+
+def lowess(x, y, groups=None, bins=LOWESS_BINS, frac=LOWESS_FRAC):
+    """Binned LOWESS curves, {group: (x, fitted y)}.
+
+    x is cut into at most bins bins per group and the smoother runs over the bin
+    means weighted by their counts, so the cost after one binning pass does not
+    depend on the number of rows. Columns with fewer distinct values than bins
+    (model_year, cylinders) keep one bin per value.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    names, codes = _group_codes(groups, len(x))
+    keep = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+    x, y, codes = x[keep], y[keep], codes[keep]
+    values = np.unique(x)
+    if len(values) <= bins:
+        edges = np.append(values, np.inf)
+    else:
+        edges = np.linspace(x.min(), x.max(), bins + 1)
+    index = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, len(edges) - 2)
+    cells = codes * (len(edges) - 1) + index
+    size = len(names) * (len(edges) - 1)
+    counts = np.bincount(cells, minlength=size).reshape(len(names), -1)
+    sum_x = np.bincount(cells, x, minlength=size).reshape(len(names), -1)
+    sum_y = np.bincount(cells, y, minlength=size).reshape(len(names), -1)
+
+    curves = {}
+    for name, count, sx, sy in zip(names, counts, sum_x, sum_y):
+        used = count > 0
+        centers = sx[used] / count[used]
+        means = sy[used] / count[used]
+        curves[name] = (centers, _local_linear(centers, means, count[used], frac))
+    return curves
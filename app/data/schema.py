@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+MPG_SCHEMA = {
+    "mpg": "float32",
+    "cylinders": "int8",
+    "displacement": "float32",
+    "horsepower": "float32",
+    "weight": "float32",
+    "acceleration": "float32",
+    "model_year": "int8",
+    "origin": "category",
+    "name": "category",
+    "company": "category",
+}
+
+
+def _column_dtype(column, dtype):
+    if dtype == "category" or np.dtype(dtype).kind != "i":
+        return dtype
+    info = np.iinfo(dtype)
+    if column.empty or (column.min() >= info.min and column.max() <= info.max):
+        return dtype
+    # Values outside the declared range: keep the smallest integer type that fits
+    return pd.to_numeric(column, downcast="integer").dtype
+
+
+def apply_schema(mpg_data, schema=MPG_SCHEMA):
+    return mpg_data.astype(
+        {
+            name: _column_dtype(mpg_data[name], dtype)
+            for name, dtype in schema.items()
+            if name in mpg_data
+        }
+    )
+
+
+def memory_report(before, after):
+    """Per-column bytes (strings included) of a frame before and after apply_schema."""
+    report = pd.DataFrame(
+        {
+            "before": before.memory_usage(deep=True, index=False),
+            "after": after.memory_usage(deep=True, index=False),
+        },
+        index=after.columns,
+    )
+    report.loc["total"] = report.sum()
+    report["before"] = report["before"].fillna(0).astype("int64")
+    report["after"] = report["after"].astype("int64")
+    report["saved"] = 1 - report["after"] / report["before"].where(report["before"] > 0)
+    return report
@@ -0,0 +1,153 @@
+"""Columnar snapshot of the cleaned dataset, memory-mapped by every worker.
+
+The first process to need a dataset version parses the csv once and writes an
+uncompressed Arrow IPC file next to it (or under $MPG_SNAPSHOT_DIR), named by
+the dataset version and a digest of the schema and cleaning code. Every
+process then maps that file and builds the DataFrame over the mapped buffers,
+so the columns live once in the page cache however many workers there are.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from data import dataframe, schema
+from data.dataframe import clean_mpg_data, data_path, dataset_version, read_mpg_csv
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.environ.get("MPG_SNAPSHOT", "1") != "0"
+SNAPSHOT_DIR = os.environ.get("MPG_SNAPSHOT_DIR")
+
+
+def _format_digest():
+    """Hash of the schema and of the code that reads and cleans the csv.
+
+    It is part of every snapshot's name, so a deploy that changes either never
+    serves a snapshot written by the old code.
+    """
+    digest = hashlib.sha256(json.dumps(schema.MPG_SCHEMA, sort_keys=True).encode())
+    for fn in (
+        dataframe.read_mpg_csv,
+        dataframe.drop_missing,
+        dataframe.clean_mpg_data,
+        schema.apply_schema,
+        schema._column_dtype,
+    ):
+        digest.update(inspect.getsource(fn).encode())
+    return digest.hexdigest()[:8]
+
+
+SNAPSHOT_FORMAT = _format_digest()
+
+
+def snapshot_directory(path=None):
+    """Where the snapshots of the csv at path go, one directory per csv name."""
+    path = data_path(path)
+    directory = Path(SNAPSHOT_DIR) if SNAPSHOT_DIR else path.parent / ".snapshots"
+    return directory / path.stem
+
+
+def snapshot_path(path=None):
+    name = f"{dataset_version(path)}-{SNAPSHOT_FORMAT}.arrow"
+    return snapshot_directory(path) / name
+
+
+def remove_snapshots(path=None):
+    """Delete every snapshot of the csv at path."""
+    shutil.rmtree(snapshot_directory(path), ignore_errors=True)
+
+
+def write_snapshot(path=None):
+    """Parse and clean the csv and write its snapshot, replacing older versions."""
+    target = snapshot_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(clean_mpg_data(read_mpg_csv(path)))
+    # One record batch, so every column maps to one contiguous buffer
+    table = table.combine_chunks()
+    partial = target.with_suffix(f".{uuid.uuid4().hex}.partial")
+    with pa.OSFile(str(partial), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(partial, target)
+    # Only this csv's own directory, so other csvs sharing $MPG_SNAPSHOT_DIR keep theirs
+    for old in target.parent.glob("*.arrow"):
+        if old != target:
+            old.unlink(missing_ok=True)
+    # Snapshots from before the per-csv directories: <stem>-<content hash>.arrow
+    legacy = re.compile(rf"{re.escape(target.parent.name)}-[0-9a-f]{{16}}\.arrow")
+    for old in target.parent.parent.glob("*.arrow"):
+        if legacy.fullmatch(old.name):
+            old.unlink(missing_ok=True)
+    return target
+
+
+def _column(array):
+    """A read-only Series over the mapped buffers; copies only if it has to."""
+    if pa.types.is_dictionary(array.type):
+        codes = array.indices
+        if codes.null_count == 0:
+            return pd.Categorical.from_codes(
+                codes.to_numpy(zero_copy_only=True),
+                categories=array.dictionary.to_pandas(),
+            )
+        return array.to_pandas()
+    try:
+        return array.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        values = array.to_numpy(zero_copy_only=False)
+        values.flags.writeable = False
+        return values
+
+
+def read_snapshot(snapshot):
+    """The snapshot as a DataFrame backed by a memory map of the file."""
+    table = pa.ipc.open_file(pa.memory_map(str(snapshot), "r")).read_all()
+    table = table.combine_chunks()
+    index_columns = (table.schema.pandas_metadata or {}).get("index_columns", [])
+    columns = {
+        name: _column(table.column(name).chunk(0))
+        for name in table.column_names
+        if name not in index_columns
+    }
+    index = None
+    if index_columns and isinstance(index_columns[0], str):
+        index = pd.Index(_column(table.column(index_columns[0]).chunk(0)))
+    elif index_columns:
+        spec = index_columns[0]
+        index = pd.RangeIndex(spec["start"], spec["stop"], spec["step"])
+    return pd.DataFrame(
+        {
+            name: pd.Series(values, index=index, copy=False)
+            for name, values in columns.items()
+        },
+        index=index,
+        copy=False,
+    )
+
+
+def load_snapshot(path=None):
+    """The cleaned dataset from its snapshot, writing the snapshot first if needed.
+
+    Returns None if snapshots are disabled (MPG_SNAPSHOT=0) or can't be written,
+    in which case callers parse the csv themselves.
+    """
+    if not SNAPSHOT_ENABLED:
+        return None
+    snapshot = snapshot_path(path)
+    try:
+        if not snapshot.exists():
+            write_snapshot(path)
+        return read_snapshot(snapshot)
+    except OSError as error:
+        logger.warning("mpg data: no snapshot at %s (%s)", snapshot, error)
+        return None
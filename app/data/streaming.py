@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from data.dataframe import data_path, dataset_cache, drop_missing
+
+DEFAULT_CHUNKSIZE = 250_000
+QUANTILE_SAMPLE_SIZE = 20_000
+MISSING_ROWS_LIMIT = 1_000
+
+
+class RunningStats:
+    """Mergeable count, mean, variance and min/max of one column.
+
+    Quantiles are estimated from a bottom-k sample: every value gets a random key
+    and the values with the k smallest keys are kept, which is a uniform sample
+    of everything seen so far and stays uniform when two accumulators merge.
+    Up to k values the quantiles are exact.
+    """
+
+    def __init__(self, sample_size=QUANTILE_SAMPLE_SIZE, seed=0):
+        self.sample_size = sample_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0)
+        self._sample = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        other = RunningStats(self.sample_size)
+        other.count = values.size
+        other.mean = values.mean()
+        other.m2 = np.square(values - other.mean).sum()
+        other.min = values.min()
+        other.max = values.max()
+        other._keys = self._rng.random(values.size)
+        other._sample = values
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        keys = np.concatenate([self._keys, other._keys])
+        sample = np.concatenate([self._sample, other._sample])
+        if keys.size > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[: self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+        self._keys, self._sample = keys, sample
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def sample(self):
+        return self._sample
+
+    def quantile(self, q):
+        if self._sample.size == 0:
+            return np.nan
+        return np.quantile(self._sample, q)
+
+
+class StreamSummary:
+    """What the landing page needs from the csv, accumulated one chunk at a time."""
+
+    def __init__(self, head_rows=10, missing_rows_limit=MISSING_ROWS_LIMIT):
+        self.head_rows = head_rows
+        self.missing_rows_limit = missing_rows_limit
+        self.rows = 0
+        self.head = None
+        self.missing = None
+        self.missing_rows = []
+        self.stats = {}
+
+    def update(self, raw):
+        if self.head is None:
+            self.head = raw.head(self.head_rows)
+        self.rows += len(raw)
+        missing = raw.isna().sum()
+        self.missing = missing if self.missing is None else self.missing + missing
+        kept = sum(len(rows) for rows in self.missing_rows)
+        if kept < self.missing_rows_limit:
+            rows = raw[raw.isna().any(axis=1)]
+            self.missing_rows.append(rows.head(self.missing_rows_limit - kept))
+
+        clean = drop_missing(raw).select_dtypes("number")
+        for name in clean.columns:
+            self.stats.setdefault(name, RunningStats()).update(clean[name].to_numpy())
+        return self
+
+    def missing_rows_frame(self):
+        return pd.concat(self.missing_rows) if self.missing_rows else self.head[:0]
+
+    def describe(self):
+        """Same layout as DataFrame.describe() on the cleaned frame."""
+        return pd.DataFrame(
+            {
+                name: [
+                    stats.count,
+                    stats.mean,
+                    np.sqrt(stats.variance),
+                    stats.min,
+                    *stats.quantile([0.25, 0.5, 0.75]),
+                    stats.max,
+                ]
+                for name, stats in self.stats.items()
+            },
+            index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        )
+
+
+def stream_mpg_summary(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Summarise the csv in chunks of chunksize rows without loading all of it."""
+    summary = StreamSummary()
+    with pd.read_csv(data_path(path), chunksize=chunksize) as chunks:
+        for raw in chunks:
+            summary.update(raw)
+    return summary
+
+
+def load_mpg_summary(path=None):
+    """stream_mpg_summary, computed once per dataset version."""
+    return dataset_cache("summary", stream_mpg_summary, path)
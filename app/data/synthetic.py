@@ -0,0 +1,182 @@
+"""Synthetic fleets with the schema and structure of data/mpg.csv, at any size.
+
+    python -m data.synthetic 100000000 fleet.parquet --format parquet
+
+(run from the app directory). Rows are generated and written chunk by chunk,
+so memory stays bounded by --chunksize whatever the number of rows.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data.dataframe import drop_missing, read_mpg_csv
+
+COLUMNS = [
+    "mpg",
+    "cylinders",
+    "displacement",
+    "horsepower",
+    "weight",
+    "acceleration",
+    "model_year",
+    "origin",
+    "name",
+]
+MEASURES = ["mpg", "displacement", "horsepower", "weight", "acceleration"]
+DECIMALS = {
+    "mpg": 1,
+    "displacement": 1,
+    "horsepower": 0,
+    "weight": 0,
+    "acceleration": 1,
+}
+DEFAULT_CHUNKSIZE = 1_000_000
+# Groups with fewer rows than this borrow the pooled year slope and residual
+# covariance instead of fitting their own (3 and 5 cylinder cars are rare).
+MIN_GROUP_ROWS = 20
+
+
+class FleetModel:
+    """What the generator keeps from the source data.
+
+    (origin, cylinders, model_year) are drawn from their empirical joint
+    distribution, which keeps the per-origin and per-cylinder marginals and how
+    the cylinder mix shifts over the years. Within each cylinder count the
+    measures follow a linear trend in model_year plus correlated normal noise
+    with that group's residual covariance, which keeps the displacement,
+    horsepower and weight correlations and the year trends. Names are drawn from
+    the real names with the same origin and cylinders, so manufacturer prefixes
+    match the origin.
+    """
+
+    def __init__(self, source):
+        self.missing_rate = source["horsepower"].isna().mean()
+        clean = drop_missing(source)
+        keys = clean.groupby(["origin", "cylinders", "model_year"]).size()
+        self.keys = keys.index.to_frame(index=False)
+        self.key_p = (keys / keys.sum()).to_numpy()
+        self.names = {
+            key: group.to_numpy()
+            for key, group in clean.groupby(["origin", "cylinders"])["name"]
+        }
+        self.year_center = clean["model_year"].mean()
+
+        def design(frame):
+            return np.column_stack(
+                [np.ones(len(frame)), frame["model_year"] - self.year_center]
+            )
+
+        values = clean[MEASURES].to_numpy(dtype="float64")
+        coef, *_ = np.linalg.lstsq(design(clean), values, rcond=None)
+        pooled_cov = np.cov(values - design(clean) @ coef, rowvar=False)
+
+        self.trend, self.noise, self.bounds = {}, {}, {}
+        for cylinders, group in clean.groupby("cylinders"):
+            group_values = group[MEASURES].to_numpy(dtype="float64")
+            if len(group) >= MIN_GROUP_ROWS:
+                group_coef, *_ = np.linalg.lstsq(
+                    design(group), group_values, rcond=None
+                )
+                residuals = group_values - design(group) @ group_coef
+                cov = np.cov(residuals, rowvar=False)
+            else:
+                group_coef = coef.copy()
+                group_coef[0] = (group_values - design(group) @ coef).mean(
+                    axis=0
+                ) + coef[0]
+                cov = pooled_cov
+            self.trend[cylinders] = group_coef
+            # Cholesky factor of the covariance, jittered in case it is singular
+            self.noise[cylinders] = np.linalg.cholesky(
+                cov + 1e-9 * np.eye(len(MEASURES))
+            )
+            low, high = group_values.min(axis=0), group_values.max(axis=0)
+            spread = (high - low) * 0.1
+            self.bounds[cylinders] = (np.maximum(low - spread, 0), high + spread)
+
+    def sample(self, n, rng):
+        picked = self.keys.iloc[rng.choice(len(self.keys), size=n, p=self.key_p)]
+        origin = picked["origin"].to_numpy()
+        cylinders = picked["cylinders"].to_numpy()
+        year = picked["model_year"].to_numpy()
+
+        values = np.empty((n, len(MEASURES)))
+        for group in np.unique(cylinders):
+            rows = np.flatnonzero(cylinders == group)
+            design = np.column_stack(
+                [np.ones(len(rows)), year[rows] - self.year_center]
+            )
+            noise = rng.standard_normal((len(rows), len(MEASURES)))
+            low, high = self.bounds[group]
+            values[rows] = np.clip(
+                design @ self.trend[group] + noise @ self.noise[group].T, low, high
+            )
+
+        names = np.empty(n, dtype=object)
+        keys = pd.MultiIndex.from_arrays([origin, cylinders])
+        for key, rows in pd.Series(np.arange(n)).groupby(keys).groups.items():
+            choices = self.names[key]
+            names[rows] = choices[rng.integers(len(choices), size=len(rows))]
+
+        fleet = pd.DataFrame(values, columns=MEASURES).round(DECIMALS)
+        fleet["weight"] = fleet["weight"].astype("int64")
+        fleet.loc[rng.random(n) < self.missing_rate, "horsepower"] = np.nan
+        fleet["cylinders"] = cylinders
+        fleet["model_year"] = year
+        fleet["origin"] = origin
+        fleet["name"] = names
+        return fleet[COLUMNS]
+
+
+def generate(rows, seed=0, chunksize=DEFAULT_CHUNKSIZE, source=None):
+    """Yield DataFrames of at most chunksize rows, rows in total.
+
+    Every chunk gets its own generator spawned from seed, so the output for a
+    given seed and chunksize is reproducible.
+    """
+    model = FleetModel(read_mpg_csv() if source is None else source)
+    chunks = -(-rows // chunksize)
+    for index, chunk_seed in enumerate(np.random.SeedSequence(seed).spawn(chunks)):
+        size = min(chunksize, rows - index * chunksize)
+        yield model.sample(size, np.random.default_rng(chunk_seed))
+
+
+def write_csv(path, rows, seed=0, chunksize=DEFAULT_CHUNKSIZE):
+    for index, chunk in enumerate(generate(rows, seed, chunksize)):
+        chunk.to_csv(
+            path, mode="w" if index == 0 else "a", header=index == 0, index=False
+        )
+
+
+def write_parquet(path, rows, seed=0, chunksize=DEFAULT_CHUNKSIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in generate(rows, seed, chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    write = write_parquet if args.format == "parquet" else write_csv
+    write(args.path, args.rows, args.seed, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
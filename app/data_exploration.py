@@ -1,24 +1,11 @@
 import streamlit as st
 
+from components import perf
+from components.page import setup_page, show_code
+from components.tables import paginated_table
+from data.streaming import load_mpg_summary
 
-import pandas as pd
-
-st.set_page_config(page_title="Data Viz", page_icon="📈", layout="wide")
-if "expand_code" not in st.session_state:
-    st.session_state.expand_code = False
-
-
-def show_code(lines_of_code):
-    with st.expander("See Python Code", expanded=st.session_state.expand_code):
-        st.code(lines_of_code, language="python")
-
-
-with st.sidebar:
-    on = st.toggle("Show Code")
-    if on:
-        st.session_state.expand_code = True
-    else:
-        st.session_state.expand_code = False
+setup_page("Data Viz", "📈")
 
 
 st.markdown(
@@ -32,16 +19,15 @@ I am using Plotly and Streamlit for this task.
 
 show_code(
     """
-mpg_data = pd.read_csv('https://raw.githubusercontent.com/mwaskom/seaborn-data/refs/heads/master/mpg.csv')
-# or read from local_path../mpg.csv
+mpg_data = pd.read_csv('../data/mpg.csv')
+# or read from https://raw.githubusercontent.com/mwaskom/seaborn-data/refs/heads/master/mpg.csv
 st.dataframe(mpg_data.head(10))
 """
 )
 
-mpg_data = pd.read_csv(
-    "https://raw.githubusercontent.com/mwaskom/seaborn-data/refs/heads/master/mpg.csv"
-)
-st.dataframe(mpg_data.head(10))
+with perf.section("data load"):
+    summary = load_mpg_summary()
+perf.dataframe(summary.head, "head")
 st.markdown("---")
 
 st.markdown("## Reading and cleaning dataset")
@@ -61,17 +47,20 @@ col1, col2 = st.columns(spec=[0.3, 0.7])
 with col1:
 
     st.markdown("```mpg_data.isna().sum()```")
-    st.dataframe(mpg_data.isna().sum())
+    perf.dataframe(summary.missing, "missing counts")
 
 with col2:
 
-    temp = mpg_data[mpg_data.isna().any(axis=1)]
+    temp = summary.missing_rows_frame()
     selected_column = "horsepower"
-    df_styled = temp.style.set_properties(
-        subset=[selected_column], **{"background-color": "#FF474C"}
-    )
     st.markdown("```mpg_data[mpg_data.isna().any(axis=1)]```")
-    st.dataframe(df_styled)
+    paginated_table(
+        temp,
+        "missing rows",
+        key="missing_rows",
+        highlight=[selected_column],
+        css="background-color: #FF474C",
+    )
 
 
 st.markdown("### Drop/Impute Data")
@@ -80,9 +69,6 @@ st.markdown(
 )
 show_code("mpg_data.dropna(inplace=True)")
 
-mpg_data.dropna(inplace=True)
-mpg_data["horsepower"] = pd.to_numeric(mpg_data["horsepower"])
-
 
 st.markdown(
     """
@@ -91,4 +77,6 @@ st.markdown(
 )
 
 show_code("st.dataframe(mpg_data.describe())")
-st.dataframe(mpg_data.describe())
+perf.dataframe(summary.describe(), "describe")
+
+perf.finish_page()
@@ -0,0 +1,52 @@
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+
+def box_figure(boxes, data_frame, hover_name="name"):
+    """px.box(y=column, x=by, color=by) drawn from a data.boxplots.BoxStats.
+
+    Each box carries its five numbers and only the outliers are sent as points,
+    so the figure's size depends on the number of groups and outliers, not rows.
+    data_frame is the frame boxes was built from, for the outliers' values.
+    """
+    palette = qualitative.Plotly
+    outliers = data_frame.iloc[boxes.outliers]
+    fig = go.Figure()
+    for i, (group, stats) in enumerate(boxes.stats.iterrows()):
+        color = palette[i % len(palette)]
+        fig.add_trace(
+            go.Box(
+                x=[str(group)],
+                q1=[stats["q1"]],
+                median=[stats["median"]],
+                q3=[stats["q3"]],
+                lowerfence=[stats["lowerfence"]],
+                upperfence=[stats["upperfence"]],
+                name=str(group),
+                legendgroup=str(group),
+                marker_color=color,
+            )
+        )
+        points = outliers[boxes.outlier_groups == group]
+        if len(points):
+            fig.add_trace(
+                go.Scatter(
+                    x=[str(group)] * len(points),
+                    y=points[boxes.column],
+                    mode="markers",
+                    name=str(group),
+                    legendgroup=str(group),
+                    showlegend=False,
+                    marker_color=color,
+                    customdata=points[hover_name] if hover_name else None,
+                    hovertemplate=(
+                        "%{customdata}<br>%{y}<extra></extra>" if hover_name else None
+                    ),
+                )
+            )
+    return fig.update_layout(
+        xaxis_title=boxes.by,
+        yaxis_title=boxes.column,
+        legend_title_text=boxes.by,
+        xaxis_type="category",
+    )
@@ -0,0 +1,84 @@
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from components.perf import section
+from data.dataframe import dataset_version, on_retire
+
+FIGURE_CACHE_BYTES = int(os.environ.get("MPG_FIGURE_CACHE_BYTES", 256 * 2**20))
+
+
+class FigureCache:
+    """Figures shared by every session, evicted least recently used first.
+
+    Entries are sized by their JSON, which is what st.plotly_chart sends, and the
+    total is kept under max_bytes. Cached figures are handed to every session, so
+    callers must not modify them.
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        with section(f"build {key[1]}", "figure"):
+            fig = build()
+        size = len(pio.to_json(fig, validate=False))
+        if size > self.max_bytes:
+            return fig
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fig, size)
+                self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def evict(self, version):
+        """Drop the figures built from one dataset version."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == version]:
+                _, size = self._entries.pop(key)
+                self.bytes -= size
+
+    def items(self):
+        """(key, figure) pairs, least recently used first."""
+        with self._lock:
+            return [(key, fig) for key, (fig, _) in self._entries.items()]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+figure_cache = FigureCache()
+on_retire(figure_cache.evict)
+
+
+def cached_figure(kind, params, build, path=None):
+    """build() once per (dataset version, kind, params); params must be hashable."""
+    return figure_cache.get_or_build((dataset_version(path), kind, params), build)
@@ -0,0 +1,179 @@
+"""Static export of every figure the pages build, for the mkdocs site.
+
+    python -m figures.export [--jobs 4] [--pages Bivariate Playground]
+
+(run from the app directory). Each page runs headlessly with Streamlit's AppTest
+in a worker process, once per option of every tab bar and select box on it, and
+every figure that goes through figures.cache.cached_figure is collected. Each
+distinct figure is written to docs/figures/<kind>/ as JSON, as HTML that loads
+plotly.js from its CDN, and as a palette PNG. Figures whose content hash matches
+docs/figures/manifest.json are skipped. docs/figures/index.md links them all.
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+APP = Path(__file__).resolve().parents[1]
+OUTPUT = APP.parent / "docs" / "figures"
+MANIFEST = "manifest.json"
+
+
+def pages():
+    return ["data_exploration.py"] + sorted(
+        os.path.relpath(path, APP) for path in glob.glob(str(APP / "pages" / "*.py"))
+    )
+
+
+def _open_sections(at):
+    """Switch on every main-area toggle, so lazy sections build their figures too."""
+    opened = set()
+    while True:
+        # Each toggle once: opening one may add more, but never loops
+        closed = [t for t in at.main.toggle if not t.value and t.key not in opened]
+        if not closed:
+            return
+        for toggle in closed:
+            opened.add(toggle.key)
+            toggle.set_value(True)
+        at.run()
+
+
+def _variants(at):
+    """Rerun at with each option of every main-area radio and select box in turn,
+    lazy sections open."""
+    _open_sections(at)
+    for kind in ("radio", "selectbox"):
+        for i in range(len(getattr(at.main, kind))):
+            widget = getattr(at.main, kind)[i]
+            first = widget.options[0] if widget.options else None
+            for option in widget.options[1:]:
+                widget = getattr(at.main, kind)[i]
+                if kind == "selectbox":
+                    widget.select_index(widget.options.index(option))
+                else:
+                    widget.set_value(option)
+                at.run()
+            if first is not None:
+                widget = getattr(at.main, kind)[i]
+                if kind == "selectbox":
+                    widget.select_index(0)
+                else:
+                    widget.set_value(first)
+                at.run()
+
+
+def collect_page(page, timeout=300):
+    """[(kind, params, figure JSON)] of every figure page builds, in a fresh worker."""
+    os.chdir(APP)
+    sys.path.insert(0, str(APP))
+    os.environ["MPG_FIGURE_CACHE_BYTES"] = str(2**40)
+    from streamlit.testing.v1 import AppTest
+
+    from figures.cache import figure_cache
+
+    at = AppTest.from_file(page, default_timeout=timeout).run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    _variants(at)
+    return [
+        (kind, params, fig.to_json(validate=False))
+        for (_, kind, params), fig in figure_cache.items()
+    ]
+
+
+def slug(kind, params):
+    """File stem for a figure: its kind and its scalar parameters."""
+    parts = [str(p) for p in params if not isinstance(p, (tuple, list))]
+    stem = "-".join(parts) or "figure"
+    return f"{kind}/{re.sub(r'[^A-Za-z0-9_.-]+', '_', stem)}"
+
+
+def write_figure(stem, figure_json, output=OUTPUT):
+    """JSON, HTML and an optimized PNG of one figure under output/stem.*"""
+    import plotly.io as pio
+    from PIL import Image
+
+    fig = pio.from_json(figure_json)
+    base = output / stem
+    base.parent.mkdir(parents=True, exist_ok=True)
+    base.with_suffix(".json").write_text(figure_json, encoding="utf-8")
+    fig.write_html(base.with_suffix(".html"), include_plotlyjs="cdn", full_html=True)
+    png = Image.open(io.BytesIO(fig.to_image(format="png")))
+    png.convert("RGB").quantize(colors=256).save(
+        base.with_suffix(".png"), optimize=True
+    )
+    return stem
+
+
+def write_index(manifest, output=OUTPUT):
+    lines = ["# Figures", "", "Generated by `python -m figures.export`.", ""]
+    kind = None
+    for stem in sorted(manifest):
+        if stem.split("/")[0] != kind:
+            kind = stem.split("/")[0]
+            lines += [f"## {kind}", ""]
+        lines += [f"[![{stem}]({stem}.png)]({stem}.html)", ""]
+    (output / "index.md").write_text("\n".join(lines), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pages", nargs="+", help="substrings of page file names")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    args = parser.parse_args()
+
+    selected = [
+        page
+        for page in pages()
+        if not args.pages or any(name in page for name in args.pages)
+    ]
+    manifest_path = args.output / MANIFEST
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    # Workers get the functions by module name: running a page with AppTest
+    # replaces the worker's __main__, which is this module under python -m.
+    from figures import export
+
+    with ProcessPoolExecutor(args.jobs) as pool:
+        figures = {}
+        for collected in pool.map(export.collect_page, selected):
+            for kind, params, figure_json in collected:
+                figures[slug(kind, params)] = figure_json
+
+        changed = {}
+        for stem, figure_json in figures.items():
+            digest = hashlib.sha256(figure_json.encode()).hexdigest()[:16]
+            exists = (args.output / stem).with_suffix(".png").exists()
+            if manifest.get(stem) != digest or not exists:
+                changed[stem] = figure_json
+            manifest[stem] = digest
+        written = list(
+            pool.map(
+                export.write_figure,
+                changed,
+                changed.values(),
+                [args.output] * len(changed),
+            )
+        )
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps(manifest, indent=1, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    write_index(manifest, args.output)
+    print(f"{len(figures)} figures, {len(written)} written, to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+from plotly.subplots import make_subplots
+
+from data.boxplots import BoxStats
+
+# Numeric columns get np.histogram_bin_edges(bins=HISTOGRAM_BINS) edges, at most
+# MAX_BINS of them; integer columns spanning fewer than MAX_BINS values get one bin
+# per integer instead, like px.histogram does for cylinders or model_year.
+HISTOGRAM_BINS = os.environ.get("MPG_HISTOGRAM_BINS", "auto")
+MAX_BINS = int(os.environ.get("MPG_MAX_BINS", 200))
+
+
+def bin_edges(values, bins=None):
+    values = np.asarray(values)
+    bins = HISTOGRAM_BINS if bins is None else bins
+    if bins == "auto" and values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        if high - low < MAX_BINS:
+            return np.arange(low, high + 2) - 0.5
+    if isinstance(bins, str) and bins.isdigit():
+        bins = int(bins)
+    edges = np.histogram_bin_edges(values, bins=bins)
+    if len(edges) > MAX_BINS + 1:
+        edges = np.histogram_bin_edges(values, bins=MAX_BINS)
+    return edges
+
+
+def _groups(data_frame, color):
+    if color is None:
+        return [None], np.zeros(len(data_frame), dtype="intp")
+    groups = data_frame[color].astype("category").cat.remove_unused_categories()
+    return list(groups.cat.categories), groups.cat.codes.to_numpy().astype("intp")
+
+
+def binned_counts(data_frame, column, color=None, bins=None):
+    """Bin labels and an array of counts per (colour group, bin), in one pass.
+
+    Numeric columns are labelled by bin centre, anything else by category.
+    """
+    values = data_frame[column]
+    names, codes = _groups(data_frame, color)
+    if pd.api.types.is_numeric_dtype(values):
+        edges = bin_edges(values.to_numpy(), bins)
+        index = np.searchsorted(edges, values.to_numpy(), side="right") - 1
+        index = np.clip(index, 0, len(edges) - 2)
+        labels = (edges[:-1] + edges[1:]) / 2
+        widths = np.diff(edges)
+    else:
+        categories = values.astype("category").cat.remove_unused_categories()
+        index = categories.cat.codes.to_numpy().astype("intp")
+        labels = np.asarray(categories.cat.categories)
+        widths = None
+    counts = np.bincount(
+        codes * len(labels) + index, minlength=len(names) * len(labels)
+    ).reshape(len(names), len(labels))
+    return names, labels, widths, counts
+
+
+def histogram_figure(
+    data_frame,
+    x=None,
+    y=None,
+    color=None,
+    color_discrete_map=None,
+    marginal=None,
+    bins=None,
+):
+    """px.histogram(..., marginal="box" or None) drawn from server-side bin counts.
+
+    The figure carries one bar per bin and colour group (and five numbers per box)
+    however many rows there are. Pass x for vertical bars or y for horizontal ones.
+    """
+    column = x if x is not None else y
+    horizontal = x is None
+    names, labels, widths, counts = binned_counts(data_frame, column, color, bins)
+    palette = qualitative.Plotly
+    colors = {
+        name: (color_discrete_map or {}).get(name, palette[i % len(palette)])
+        for i, name in enumerate(names)
+    }
+
+    if marginal == "box":
+        fig = make_subplots(
+            rows=2,
+            cols=1,
+            shared_xaxes=True,
+            row_heights=[0.26, 0.74],
+            vertical_spacing=0.03,
+        )
+        boxes = BoxStats.build(data_frame, column, color).stats.drop(columns="n")
+        for name, stats in boxes.iterrows():
+            fig.add_trace(
+                go.Box(
+                    **{key: [value] for key, value in stats.items()},
+                    y=[str(name)],
+                    orientation="h",
+                    name=str(name),
+                    legendgroup=str(name),
+                    showlegend=False,
+                    marker_color=colors[name],
+                ),
+                row=1,
+                col=1,
+            )
+        main = {"row": 2, "col": 1}
+    else:
+        fig = go.Figure()
+        main = {}
+
+    for name, group_counts in zip(names, counts):
+        bar = (
+            {"y": labels, "x": group_counts}
+            if horizontal
+            else {"x": labels, "y": group_counts}
+        )
+        fig.add_trace(
+            go.Bar(
+                **bar,
+                width=widths,
+                orientation="h" if horizontal else "v",
+                name=str(column if name is None else name),
+                legendgroup=str(name),
+                showlegend=name is not None,
+                marker_color=colors[name],
+            ),
+            **main,
+        )
+
+    fig.update_layout(barmode="relative", bargap=0, legend_title_text=color)
+    titles = {"title_text": column}, {"title_text": "count"}
+    fig.update_xaxes(**titles[horizontal], **main)
+    fig.update_yaxes(**titles[not horizontal], **main)
+    return fig
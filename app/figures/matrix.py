@@ -0,0 +1,157 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from data.dataframe import data_path, dataset_cache
+from data.derived import DERIVED_COLUMNS, mpg_view
+from figures.scatter import (
+    DENSITY_BINS,
+    _aggregate_method,
+    density_bins,
+    density_trace,
+    scatter_mode,
+    scatter_trace,
+)
+
+# Grid cells are built by MATRIX_WORKERS threads. A full scatter matrix has a
+# cell per pair of columns, so once aggregated its cells are MATRIX_BINS x
+# MATRIX_BINS density grids rather than DENSITY_BINS ones.
+MATRIX_WORKERS = int(os.environ.get("MPG_MATRIX_WORKERS", 4))
+MATRIX_BINS = int(os.environ.get("MPG_MATRIX_BINS", 40))
+CELL_HEIGHT = 240
+CELL_SIZE = 160
+
+
+def grid_shape(cells, cols=None):
+    """(rows, cols) of a grid for cells subplots, taller than it is wide."""
+    if cols is None:
+        cols = max(2, math.ceil(math.sqrt(cells / 1.5)))
+    cols = max(1, min(cols, cells))
+    return math.ceil(cells / cols), cols
+
+
+def pair_density(x, y, bins=None, path=None):
+    """density_bins of two columns of the whole dataset, once per version and pair."""
+    bins = bins or DENSITY_BINS
+    a, b = sorted([x, y])
+
+    def build(path):
+        data = mpg_view(*(c for c in (a, b) if c in DERIVED_COLUMNS), path=path)
+        return density_bins(data[a], data[b], bins)
+
+    a_centers, b_centers, counts = dataset_cache(("density", a, b, bins), build, path)
+    if (a, b) == (x, y):
+        return a_centers, b_centers, counts
+    return b_centers, a_centers, counts.T
+
+
+def cell_trace(
+    data_frame, x, y, bins=None, cached=False, method=None, path=None, **thresholds
+):
+    """One cell of a grid, drawn as scatter_trace would draw it.
+
+    cached=True means data_frame is the unfiltered dataset, so density cells can
+    come from pair_density and be shared with every other figure and session.
+    """
+    name = f"{x.capitalize()} vs {y.capitalize()}"
+    density = (
+        scatter_mode(len(data_frame), **thresholds) == "aggregate"
+        and _aggregate_method(data_frame[x], data_frame[y], method) == "density"
+    )
+    if density and cached:
+        return density_trace(*pair_density(x, y, bins, path), name=name)
+    if density and bins:
+        return density_trace(
+            *density_bins(data_frame[x], data_frame[y], bins), name=name
+        )
+    return scatter_trace(
+        data_frame[x], data_frame[y], name=name, method=method, **thresholds
+    )
+
+
+def build_cells(data_frame, pairs, **options):
+    """cell_trace of every (x, y) in pairs, in parallel."""
+    # Resolved here: the worker threads can't see which dataset the session is on
+    options["path"] = data_path(options.get("path"))
+    workers = max(1, min(MATRIX_WORKERS, len(pairs)))
+    with ThreadPoolExecutor(workers) as pool:
+        return list(
+            pool.map(lambda pair: cell_trace(data_frame, *pair, **options), pairs)
+        )
+
+
+def grid_figure(data_frame, pairs, cols=None, width=1080, **options):
+    """A subplot per (x, y) in pairs, laid out by grid_shape; see cell_trace."""
+    rows, cols = grid_shape(len(pairs), cols)
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        vertical_spacing=min(0.08, 0.3 / rows),
+        horizontal_spacing=min(0.08, 0.3 / cols),
+    )
+    traces = build_cells(data_frame, pairs, **options)
+    for i, ((x, y), trace) in enumerate(zip(pairs, traces)):
+        row, col = i // cols + 1, i % cols + 1
+        fig.add_trace(trace, row=row, col=col)
+        fig.update_xaxes(title_text=x.capitalize(), row=row, col=col)
+        fig.update_yaxes(title_text=y.capitalize(), row=row, col=col)
+    return fig.update_layout(height=CELL_HEIGHT * rows, width=width)
+
+
+def others_vs_figure(data_frame, selected, col_names, **options):
+    """selected against each of the other col_names, two to a row."""
+    pairs = [(selected, name) for name in col_names if name != selected]
+    fig = grid_figure(data_frame, pairs, cols=2, **options)
+    return fig.update_layout(title_text=f"{selected.capitalize()} vs Others")
+
+
+def scatter_matrix_figure(data_frame, columns, cached=False, **thresholds):
+    """Every pair of columns against each other, below the diagonal.
+
+    Up to the aggregate threshold this is a single WebGL Splom trace. Above it
+    every cell is a MATRIX_BINS density grid, built in parallel.
+    """
+    columns = list(columns)
+    size = CELL_SIZE * len(columns)
+    if scatter_mode(len(data_frame), **thresholds) != "aggregate":
+        fig = go.Figure(
+            go.Splom(
+                dimensions=[
+                    {"label": name, "values": data_frame[name]} for name in columns
+                ],
+                showupperhalf=False,
+                diagonal_visible=False,
+                marker={"size": 3, "opacity": 0.6},
+            )
+        )
+        return fig.update_layout(height=size, width=size)
+
+    pairs = [(x, y) for i, y in enumerate(columns) for x in columns[:i]]
+    traces = build_cells(
+        data_frame,
+        pairs,
+        bins=MATRIX_BINS,
+        cached=cached,
+        method="density",
+        **thresholds,
+    )
+    n = len(columns) - 1
+    fig = make_subplots(
+        rows=n,
+        cols=n,
+        shared_xaxes=True,
+        shared_yaxes=True,
+        vertical_spacing=0.2 / n,
+        horizontal_spacing=0.2 / n,
+    )
+    for (x, y), trace in zip(pairs, traces):
+        row, col = columns.index(y), columns.index(x) + 1
+        fig.add_trace(trace, row=row, col=col)
+        if col == 1:
+            fig.update_yaxes(title_text=y, row=row, col=col)
+        if row == n:
+            fig.update_xaxes(title_text=x, row=row, col=col)
+    return fig.update_layout(height=size, width=size)
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from components.page import lazy_import
+
+px = lazy_import("plotly.express")
+
+# Above WEBGL_THRESHOLD rows markers are drawn with WebGL instead of SVG; above
+# AGGREGATE_THRESHOLD rows are reduced on the server before being sent at all,
+# either to DENSITY_BINS x DENSITY_BINS counts ("density") or to a uniform random
+# sample of SAMPLE_SIZE rows ("sample"), which keeps the point density.
+WEBGL_THRESHOLD = int(os.environ.get("MPG_WEBGL_THRESHOLD", 5_000))
+AGGREGATE_THRESHOLD = int(os.environ.get("MPG_AGGREGATE_THRESHOLD", 200_000))
+AGGREGATE_METHOD = os.environ.get("MPG_AGGREGATE_METHOD", "density")
+DENSITY_BINS = int(os.environ.get("MPG_DENSITY_BINS", 100))
+SAMPLE_SIZE = int(os.environ.get("MPG_SAMPLE_SIZE", 20_000))
+
+
+def scatter_mode(rows, webgl_threshold=None, aggregate_threshold=None):
+    if webgl_threshold is None:
+        webgl_threshold = WEBGL_THRESHOLD
+    if aggregate_threshold is None:
+        aggregate_threshold = AGGREGATE_THRESHOLD
+    if rows > aggregate_threshold:
+        return "aggregate"
+    if rows > webgl_threshold:
+        return "webgl"
+    return "svg"
+
+
+def _aggregate_method(x, y, method):
+    method = method or AGGREGATE_METHOD
+    if method not in ("density", "sample"):
+        raise ValueError(f"unknown aggregate method: {method!r}")
+    numeric = pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y)
+    return method if numeric else "sample"
+
+
+def sample_rows(data, size=None):
+    """A reproducible uniform sample, so reruns draw (and cache) the same figure."""
+    size = size or SAMPLE_SIZE
+    if len(data) <= size:
+        return data
+    return data.sample(n=size, random_state=0)
+
+
+def density_bins(x, y, bins=None):
+    """2D counts on a bins x bins grid, with zero cells dropped from the payload."""
+    counts, x_edges, y_edges = np.histogram2d(
+        np.asarray(x, dtype="float64"),
+        np.asarray(y, dtype="float64"),
+        bins=bins or DENSITY_BINS,
+    )
+    return (
+        (x_edges[:-1] + x_edges[1:]) / 2,
+        (y_edges[:-1] + y_edges[1:]) / 2,
+        np.where(counts > 0, counts, np.nan).T,
+    )
+
+
+def density_trace(x_centers, y_centers, counts, name=None):
+    """A heatmap of density_bins output."""
+    return go.Heatmap(
+        x=x_centers,
+        y=y_centers,
+        z=counts,
+        name=name,
+        colorscale="Blues",
+        showscale=False,
+        hovertemplate="x=%{x}<br>y=%{y}<br>rows=%{z}<extra></extra>",
+    )
+
+
+def scatter_trace(x, y, name=None, method=None, **thresholds):
+    """A single marker trace for x against y, picked by scatter_mode."""
+    mode = scatter_mode(len(x), **thresholds)
+    if mode == "svg":
+        return go.Scatter(x=x, y=y, mode="markers", name=name)
+    if mode == "aggregate" and _aggregate_method(x, y, method) == "density":
+        return density_trace(*density_bins(x, y), name=name)
+    if mode == "aggregate":
+        sample = sample_rows(pd.DataFrame({"x": x, "y": y}))
+        x, y = sample["x"], sample["y"]
+    return go.Scattergl(x=x, y=y, mode="markers", name=name)
+
+
+def scatter_figure(data_frame, x, y, color=None, method=None, **thresholds):
+    """px.scatter for any number of rows.
+
+    A colour column can't be shown by density bins, so coloured figures over the
+    aggregate threshold always use the sample.
+    """
+    mode = scatter_mode(len(data_frame), **thresholds)
+    if mode == "svg":
+        return px.scatter(data_frame=data_frame, x=x, y=y, color=color)
+    if mode == "aggregate":
+        method = _aggregate_method(data_frame[x], data_frame[y], method)
+        if method == "density" and color is None:
+            fig = go.Figure(
+                scatter_trace(data_frame[x], data_frame[y], method=method, **thresholds)
+            )
+            return fig.update_layout(xaxis_title=x, yaxis_title=y)
+        columns = list(dict.fromkeys([x, y] + ([color] if color else [])))
+        data_frame = sample_rows(data_frame[columns])
+    return px.scatter(data_frame=data_frame, x=x, y=y, color=color, render_mode="webgl")
@@ -0,0 +1,44 @@
+import plotly.graph_objects as go
+
+from data.regression import lowess, ols
+
+
+def trendline_traces(data_frame, x, y, method="ols", by=None, colors=None):
+    """Line traces like px.scatter(trendline=...), one per group of by.
+
+    Every group is fitted in the same vectorized call (data.regression) and drawn
+    as a plain line, with the fit in the hover text for OLS.
+    """
+    groups = None if by is None else data_frame[by]
+    traces = []
+    if method == "ols":
+        fits = ols(data_frame[x], data_frame[y], groups)
+        for name, fit in fits.iterrows():
+            xs = [fit.x_min, fit.x_max]
+            traces.append(
+                go.Scatter(
+                    x=xs,
+                    y=[fit.intercept + fit.slope * value for value in xs],
+                    mode="lines",
+                    name="OLS trendline" if name is None else f"{name} OLS",
+                    hovertemplate=(
+                        f"{y} = {fit.slope:.6g} * {x} + {fit.intercept:.6g}"
+                        f"<br>R<sup>2</sup>={fit.r2:.6f}<extra></extra>"
+                    ),
+                    line_color=(colors or {}).get(name),
+                )
+            )
+    elif method == "lowess":
+        for name, (xs, fitted) in lowess(data_frame[x], data_frame[y], groups).items():
+            traces.append(
+                go.Scatter(
+                    x=xs,
+                    y=fitted,
+                    mode="lines",
+                    name="LOWESS trendline" if name is None else f"{name} LOWESS",
+                    line_color=(colors or {}).get(name),
+                )
+            )
+    else:
+        raise ValueError(f"unknown trendline method {method!r}")
+    return traces
@@ -1,24 +1,18 @@
 import streamlit as st
-import pandas as pd
 
-from data.dataframe import mpg_data
+from components import perf
+from components.images import gallery
+from components.page import setup_page, show_code
+from components.tables import paginated_table
+from data.derived import mpg_view
+from data.orderings import load_ordering
+from data.extremes import load_extremes
 
-st.set_page_config(page_title="Initial Analysis", page_icon="🔍", layout="wide")
-if "expand_code" not in st.session_state:
-    st.session_state.expand_code = False
+setup_page("Initial Analysis", "🔍")
 
-
-def show_code(lines_of_code):
-    with st.expander("See Python Code", expanded=st.session_state.expand_code):
-        st.code(lines_of_code, language="python")
-
-
-with st.sidebar:
-    on = st.toggle("Show Code")
-    if on:
-        st.session_state.expand_code = True
-    else:
-        st.session_state.expand_code = False
+with perf.section("data load"):
+    mpg_data = mpg_view()
+    extremes = load_extremes()
 
 
 st.markdown("# Extreme values: Max and Min")
@@ -40,71 +34,94 @@ mpg_data.loc[mpg_data["cylinders"] == 3]"""
 )
 
 
-selected_column = st.selectbox(
-    "Field", options=["horsepower", "mpg", "acceleration", "model_year"]
-)
+@st.fragment
+def field_extremes():
+    selected_column = st.selectbox(
+        "Field", options=["horsepower", "mpg", "acceleration", "model_year"]
+    )
 
-if selected_column == "model_year":
-    st.write("Newest cars")
-else:
-    st.write("Max value for:", selected_column)
-st.dataframe(mpg_data.loc[mpg_data[selected_column] == mpg_data[selected_column].max()])
-
-if selected_column == "model_year":
-    st.write("Oldest cars")
-else:
-    st.write("Min value for:", selected_column)
-st.dataframe(mpg_data.loc[mpg_data[selected_column] == mpg_data[selected_column].min()])
-
-
-cylinder_val = st.slider("No of cylinders:", max_value=8, min_value=3, value=4)
-if not cylinder_val == 7:
-    series = (
-        mpg_data.loc[mpg_data["cylinders"] == cylinder_val]
-        .sort_values(by="horsepower", ascending=False)
-        .iloc[0]
+    if selected_column == "model_year":
+        st.write("Newest cars")
+    else:
+        st.write("Max value for:", selected_column)
+    paginated_table(
+        mpg_data,
+        "max rows",
+        key=f"max_{selected_column}",
+        positions=extremes.extremes(selected_column, "max"),
+        ordering=load_ordering,
     )
-    st.dataframe(pd.DataFrame([series]))
-else:
-    st.write("No Cars with 7 cylinders!")
+
+    if selected_column == "model_year":
+        st.write("Oldest cars")
+    else:
+        st.write("Min value for:", selected_column)
+    paginated_table(
+        mpg_data,
+        "min rows",
+        key=f"min_{selected_column}",
+        positions=extremes.extremes(selected_column, "min"),
+        ordering=load_ordering,
+    )
+
+
+field_extremes()
+
+
+@st.fragment
+def most_powerful_by_cylinders():
+    cylinder_val = st.slider("No of cylinders:", max_value=8, min_value=3, value=4)
+    most_powerful = extremes.top_k(cylinder_val, "horsepower", k=1)
+    if len(most_powerful):
+        perf.dataframe(mpg_data.iloc[most_powerful], "most powerful")
+    else:
+        st.write(f"No Cars with {cylinder_val} cylinders!")
+
+
+most_powerful_by_cylinders()
 
 st.markdown("---")
 st.markdown("# Cars in the Dataset")
 
-col1, col2 = st.columns(spec=[0.5, 0.5])
-with col1:
-    st.image(
-        image="../assets/1977_mazda_rx-4.jpg",
-        caption="Powerful 3 cylinder car: 1977 Mazda RX-4",
-    )
-    st.image(
-        image="../assets/1980_mazda_rx-7.jpg",
-        caption="Newer gen 3 cylinder car: 1980 Mazda RX-7",
-    )
-    st.image(
-        image="../assets/audi_5000.jpg", caption="Powerful 5 cylinder car: Audi 5000"
-    )
-    st.image(
-        image="../assets/buick_regal_sport_coupe.jpg",
-        caption='Powerful 6 cylinder car: Buick Regal Sport "coupe"',
-    )
-    st.image(
-        image="../assets/saab_99le.jpg", caption="Powerful 4 cylinder car: Saab 91LE"
-    )
-with col2:
-    st.image(
-        image="../assets/harvester_intl_1200D.png",
-        caption="Least fuel efficient in the dataset: Harvester Intl 1200D",
-    )
-    st.image(
-        image="../assets/mazda_glc.png",
-        caption="Most fuel efficient in the dataset: Mazda GLC",
-    )
-    st.image(
-        image="../assets/pontiac_GP.jpg",
-        caption="Highest Horsepower in the dataset: Pontiac GP",
-    )
-    st.image(
-        image="../assets/pugeot_504.png",
-        caption="Highest Acceleration in the dataset: Pugeot 504",
+with perf.section("gallery", "images"):
+    gallery(
+        [
+            [
+                (
+                    "../assets/1977_mazda_rx-4.jpg",
+                    "Powerful 3 cylinder car: 1977 Mazda RX-4",
+                ),
+                (
+                    "../assets/1980_mazda_rx-7.jpg",
+                    "Newer gen 3 cylinder car: 1980 Mazda RX-7",
+                ),
+                ("../assets/audi_5000.jpg", "Powerful 5 cylinder car: Audi 5000"),
+                (
+                    "../assets/buick_regal_sport_coupe.jpg",
+                    'Powerful 6 cylinder car: Buick Regal Sport "coupe"',
+                ),
+                ("../assets/saab_99le.jpg", "Powerful 4 cylinder car: Saab 91LE"),
+            ],
+            [
+                (
+                    "../assets/harvester_intl_1200D.png",
+                    "Least fuel efficient in the dataset: Harvester Intl 1200D",
+                ),
+                (
+                    "../assets/mazda_glc.png",
+                    "Most fuel efficient in the dataset: Mazda GLC",
+                ),
+                (
+                    "../assets/pontiac_GP.jpg",
+                    "Highest Horsepower in the dataset: Pontiac GP",
+                ),
+                (
+                    "../assets/pugeot_504.png",
+                    "Highest Acceleration in the dataset: Pugeot 504",
+                ),
+            ],
+        ],
+        key="cars",
     )
+
+perf.finish_page()
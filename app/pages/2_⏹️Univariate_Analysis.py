@@ -1,33 +1,42 @@
+import numpy as np
 import streamlit as st
-import plotly.express as px
 
-from data.dataframe import mpg_data
+from components import perf
+from components.filters import sidebar_filters
+from components.page import lazy_import, setup_page, show_code
+from components.lazy import lazy_section, lazy_tabs
+from components.tables import paginated_table
+from data.boxplots import BOX_GROUPS, BoxStats, load_box_stats
+from data.derived import mpg_view
+from data.orderings import load_ordering
+from figures.box import box_figure
+from figures.cache import cached_figure
+from figures.histogram import histogram_figure
 
-color_map = {"japan": "#c25553", "europe": "#ed7d31", "usa": "#5b9bd5"}
-
-st.set_page_config(page_title="Univariate", page_icon="⏹️", layout="wide")
-if "expand_code" not in st.session_state:
-    st.session_state.expand_code = False
+px = lazy_import("plotly.express")
 
+setup_page("Univariate", "⏹️")
 
-def show_code(lines_of_code):
-    with st.expander("See Python Code", expanded=st.session_state.expand_code):
-        st.code(lines_of_code, language="python")
+filters = sidebar_filters()
+with perf.section("data load"):
+    mpg_data = filters.apply(mpg_view())
 
+color_map = {"japan": "#c25553", "europe": "#ed7d31", "usa": "#5b9bd5"}
 
-with st.sidebar:
-    on = st.toggle("Show Code")
-    if on:
-        st.session_state.expand_code = True
-    else:
-        st.session_state.expand_code = False
 
 st.markdown("# Univariate Analysis")
 st.markdown("## Graphs and Visualizations")
 
 
 st.code('px.histogram(data_frame=mpg_data, x="cylinders")', language="python")
-st.plotly_chart(px.histogram(data_frame=mpg_data, x="cylinders"))
+perf.plotly_chart(
+    cached_figure(
+        "cylinders_histogram",
+        (filters.key,),
+        lambda: histogram_figure(data_frame=mpg_data, x="cylinders"),
+    ),
+    "cylinders_histogram",
+)
 
 
 st.markdown(
@@ -45,49 +54,62 @@ One final consideration to this line of thinking should be that the data collect
 
 show_code(
     """
-    px.box(data_frame=mpg_data.sort_values(by="cylinders"),y=["horsepower"],facet_col="cylinders")
-    px.box(data_frame=mpg_data.sort_values(by="cylinders"),y=["horsepower"],facet_col="mpg")
-    px.box(data_frame=mpg_data.sort_values(by="cylinders"),y=["horsepower"],facet_col="acceleration")
-    """
+px.box(data_frame=mpg_data, x="cylinders", y="horsepower", color="cylinders")
+px.box(data_frame=mpg_data, x="cylinders", y="mpg", color="cylinders")
+px.box(data_frame=mpg_data, x="cylinders", y="acceleration", color="cylinders")"""
 )
 
-tab1, tab2, tab3 = st.tabs(["Horsepower", "Mpg", "Acceleration"])
-tab1.plotly_chart(
-    px.box(
-        data_frame=mpg_data.sort_values(by="cylinders"),
-        y=["horsepower"],
-        facet_col="cylinders",
-        color="cylinders",
-    )
-)
-tab2.plotly_chart(
-    px.box(
-        data_frame=mpg_data.sort_values(by="cylinders"),
-        y=["mpg"],
-        facet_col="cylinders",
-        color="cylinders",
-    )
-)
-tab3.plotly_chart(
-    px.box(
-        data_frame=mpg_data.sort_values(by="cylinders"),
-        y=["acceleration"],
-        facet_col="cylinders",
-        color="cylinders",
+
+def box_stats(measure, by):
+    if filters.positions is None:
+        return load_box_stats(measure, by)
+    return BoxStats.build(mpg_data, measure, by)
+
+
+def cylinder_box_tab(tab):
+    measure = box_tabs[tab]
+    by = st.radio("Grouped by", BOX_GROUPS, horizontal=True, key="cylinder_box_by")
+    perf.plotly_chart(
+        cached_figure(
+            "cylinder_box",
+            (measure, by, filters.key),
+            lambda: box_figure(box_stats(measure, by), mpg_data),
+        ),
+        "cylinder_box",
     )
-)
+
+
+box_tabs = {"Horsepower": "horsepower", "Mpg": "mpg", "Acceleration": "acceleration"}
+lazy_tabs(list(box_tabs), cylinder_box_tab, key="cylinder_box_tab")
 
 
 st.markdown("### Inspecting Outliers")
 show_code(
     """
-mpg_data[mpg_data.horsepower == 165 ]
-mpg_data[mpg_data.horsepower == 230]
-mpg_data[(mpg_data.mpg == 38) & (mpg_data.cylinders == 6)]
-mpg_data[(mpg_data.mpg == 26.6) & (mpg_data.cylinders == 8)]"""
+grouped = mpg_data.groupby("cylinders")["horsepower"]
+q1, q3 = grouped.transform("quantile", 0.25), grouped.transform("quantile", 0.75)
+low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+mpg_data[(mpg_data.horsepower < low) | (mpg_data.horsepower > high)]"""
 )
 
 
+def outliers():
+    tab = st.radio("Measure", list(box_tabs), horizontal=True, key="outliers_measure")
+    by = st.radio("Grouped by", BOX_GROUPS, horizontal=True, key="outliers_by")
+    measure = box_tabs[tab]
+    paginated_table(
+        mpg_data,
+        f"{measure} outliers by {by}",
+        key="outliers_table",
+        positions=box_stats(measure, by).outliers,
+        highlight=[measure],
+        ordering=filters.ordering(load_ordering),
+    )
+
+
+lazy_section("Outliers", outliers, key="outliers")
+
+
 st.markdown(
     """
 ### Observations
@@ -108,34 +130,43 @@ There are some outliers is both mpg and horsepower graphs.
 ### Muscle Cars
 """
 )
-with st.popover("High horsepower cars", use_container_width=True):
-    df = mpg_data[mpg_data.horsepower > 220]
-    st.dataframe(
-        df.style.apply(
-            lambda x: [
-                "background-color: lightgreen; color: black"
-                if x.name == "horsepower"
-                else ""
-                for _ in x
-            ]
-        )
+
+
+def high_horsepower_cars():
+    matches = mpg_data.horsepower > 220
+    paginated_table(
+        mpg_data,
+        "high horsepower cars",
+        key="high_horsepower_cars_table",
+        positions=np.flatnonzero(matches),
+        highlight=["horsepower"],
+        ordering=filters.ordering(load_ordering),
     )
-with st.popover(
-    "6 cylinder Buick regal in comparision to other 8 cylinder cars",
-    use_container_width=True,
-):
-    df = mpg_data[mpg_data.horsepower == 165]
-    st.dataframe(
-        df.style.apply(
-            lambda x: [
-                "background-color: lightgreen; color: black"
-                if x.name == "horsepower"
-                else ""
-                for _ in x
-            ]
-        )
+
+
+lazy_section("High horsepower cars", high_horsepower_cars, key="high_horsepower_cars")
+
+
+def buick_regal():
+    # Cars with the horsepower of a 6 cylinder outlier, whatever their cylinders
+    outliers = box_stats("horsepower", "cylinders").outliers_in(6)
+    matches = mpg_data.horsepower.isin(mpg_data.horsepower.iloc[outliers])
+    paginated_table(
+        mpg_data,
+        "buick regal",
+        key="buick_regal_table",
+        positions=np.flatnonzero(matches),
+        highlight=["horsepower"],
+        ordering=filters.ordering(load_ordering),
     )
 
+
+lazy_section(
+    "6 cylinder Buick regal in comparision to other 8 cylinder cars",
+    buick_regal,
+    key="buick_regal",
+)
+
 st.markdown(
     """
 The 6 cylinder **buick regal sport coupe (turbo)** is a muscle car giving a very high horsepower and comes in line with other average 8 cylinder cars. Similarly the 230hp **pontiac grand prix** is a 8 cylinder beast of a muscle car which explains the very high horsepower.
@@ -143,28 +174,43 @@ The 6 cylinder **buick regal sport coupe (turbo)** is a muscle car giving a very
 ### Efficient Cars
 """
 )
-with st.popover("6 cylinder cars with good efficiency", use_container_width=True):
-    df = mpg_data[(mpg_data.mpg > 30) & (mpg_data.cylinders == 6)]
-    st.dataframe(
-        df.style.apply(
-            lambda x: [
-                "background-color: lightgreen; color: black" if x.name == "mpg" else ""
-                for _ in x
-            ]
-        )
+
+
+def efficient_6_cylinder_cars():
+    paginated_table(
+        mpg_data,
+        "efficient 6 cylinder cars",
+        key="efficient_6_cylinder_cars_table",
+        positions=box_stats("mpg", "cylinders").outliers_in(6, high=True),
+        highlight=["mpg"],
+        ordering=filters.ordering(load_ordering),
     )
 
-with st.popover("8 cylinder cars with good efficiency", use_container_width=True):
-    df = mpg_data.loc[(mpg_data.mpg > 20) & (mpg_data.cylinders == 8)]
-    st.dataframe(
-        df.style.apply(
-            lambda x: [
-                "background-color: lightgreen; color: black" if x.name == "mpg" else ""
-                for _ in x
-            ]
-        )
+
+lazy_section(
+    "6 cylinder cars with good efficiency",
+    efficient_6_cylinder_cars,
+    key="efficient_6_cylinder_cars",
+)
+
+
+def efficient_8_cylinder_cars():
+    paginated_table(
+        mpg_data,
+        "efficient 8 cylinder cars",
+        key="efficient_8_cylinder_cars_table",
+        positions=box_stats("mpg", "cylinders").outliers_in(8, high=True),
+        highlight=["mpg"],
+        ordering=filters.ordering(load_ordering),
     )
 
+
+lazy_section(
+    "8 cylinder cars with good efficiency",
+    efficient_8_cylinder_cars,
+    key="efficient_8_cylinder_cars",
+)
+
 st.markdown(
     """
 There are certain economy or diesel version of cars that make them exceptionally fuel efficient like the 6 cylinder **oldsmobile cutlass ciera (diesel)** or the 8 cylinder **oldsmobile cutlass ls**
@@ -174,10 +220,18 @@ To get a more complete picture, we need to perform further analysis. Let us henc
 )
 
 
-st.plotly_chart(
-    px.histogram(
-        data_frame=mpg_data, y="origin", color="origin", color_discrete_map=color_map
-    )
+perf.plotly_chart(
+    cached_figure(
+        "origin_count",
+        (filters.key,),
+        lambda: histogram_figure(
+            data_frame=mpg_data,
+            y="origin",
+            color="origin",
+            color_discrete_map=color_map,
+        ),
+    ),
+    "origin_count",
 )
 
 
@@ -188,53 +242,39 @@ st.markdown(
     "We can now analyze our cars categoirically based on the countries. Let us see what differences cars of each country possess."
 )
 
-orig1, orig2, orig3, orig4 = st.tabs(
-    ["Model Year", "Miles Per Gallon", "Acceleration", "Horsepower"]
-)
 
-orig1.plotly_chart(
-    px.histogram(
-        mpg_data,
-        x="model_year",
-        color="origin",
-        marginal="box",
-        color_discrete_map=color_map,
-        hover_data=mpg_data.columns,
-    )
-)
-orig2.plotly_chart(
-    px.histogram(
+def origin_histogram(x):
+    return histogram_figure(
         mpg_data,
-        x="mpg",
+        x=x,
         color="origin",
         marginal="box",
         color_discrete_map=color_map,
-        hover_data=mpg_data.columns,
     )
-)
-orig3.plotly_chart(
-    px.histogram(
-        mpg_data,
-        x="acceleration",
-        color="origin",
-        marginal="box",
-        color_discrete_map=color_map,
-        hover_data=mpg_data.columns,
-    )
-)
-orig4.plotly_chart(
-    px.histogram(
-        mpg_data,
-        x="horsepower",
-        color="origin",
-        marginal="box",
-        color_discrete_map=color_map,
-        hover_data=mpg_data.columns,
+
+
+def origin_histogram_tab(tab):
+    x = origin_tabs[tab]
+    perf.plotly_chart(
+        cached_figure(
+            "origin_histogram", (x, filters.key), lambda: origin_histogram(x)
+        ),
+        "origin_histogram",
     )
-)
+
+
+origin_tabs = {
+    "Model Year": "model_year",
+    "Miles Per Gallon": "mpg",
+    "Acceleration": "acceleration",
+    "Horsepower": "horsepower",
+}
+lazy_tabs(list(origin_tabs), origin_histogram_tab, key="origin_histogram_tab")
 
 
 st.markdown(
     """This shows us that Japanese cars are the most fuel efficient while USA has on average, more powerful cars.
 Also worth noting is that USA has a higher fence for hp meaning that there are car variants that are very powerful (muscle cars) which we see lacking in other countires."""
 )
+
+perf.finish_page()
@@ -1,30 +1,25 @@
 import streamlit as st
 
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from components import perf
+from components.filters import sidebar_filters
+from components.page import lazy_import, setup_page, show_code
+from data.cube import load_cube
+from data.derived import mpg_view
+from figures.cache import cached_figure
+from figures.histogram import histogram_figure
+from figures.matrix import others_vs_figure
 
-from data.dataframe import mpg_data
+px = lazy_import("plotly.express")
 
-color_map = {"japan": "#c25553", "europe": "#ed7d31", "usa": "#5b9bd5"}
-
-st.set_page_config(page_title="Bivariate", page_icon="📊", layout="wide")
-if "expand_code" not in st.session_state:
-    st.session_state.expand_code = False
+setup_page("Bivariate", "📊")
 
+filters = sidebar_filters()
+with perf.section("data load"):
+    mpg_data = filters.apply(mpg_view("company"))
+    cube = load_cube()
 
-def show_code(lines_of_code):
-    with st.expander("See Python Code", expanded=st.session_state.expand_code):
-        st.code(lines_of_code, language="python")
-
+color_map = {"japan": "#c25553", "europe": "#ed7d31", "usa": "#5b9bd5"}
 
-with st.sidebar:
-    on = st.toggle("Show Code")
-    if on:
-        st.session_state.expand_code = True
-    else:
-        st.session_state.expand_code = False
 
 st.markdown("## Bivariate analysis")
 
@@ -38,14 +33,19 @@ avg_group.reset_index()
 px.line(data_frame=avg_group,  y='average_mpg')"""
 )
 
-st.plotly_chart(
-    px.scatter(
-        data_frame=mpg_data,
-        x="cylinders",
-        y="origin",
-        color="origin",
-        color_discrete_map=color_map,
-    )
+perf.plotly_chart(
+    cached_figure(
+        "cylinders_by_origin",
+        (filters.key,),
+        lambda: px.scatter(
+            data_frame=mpg_data,
+            x="cylinders",
+            y="origin",
+            color="origin",
+            color_discrete_map=color_map,
+        ),
+    ),
+    "cylinders_by_origin",
 )
 
 
@@ -57,17 +57,33 @@ This might be due to racing being more poular and prevalant in the US or due to
 )
 
 
-st.plotly_chart(
-    px.scatter(data_frame=mpg_data, x="model_year", y="mpg", facet_col="origin")
+perf.plotly_chart(
+    cached_figure(
+        "mpg_by_year_and_origin",
+        (filters.key,),
+        lambda: px.scatter(
+            data_frame=mpg_data, x="model_year", y="mpg", facet_col="origin"
+        ),
+    ),
+    "mpg_by_year_and_origin",
 )
 st.markdown(
     "A trend of mpg getting better across the years can be seen in all the countries."
 )
 
-avg_group = pd.DataFrame()
-avg_group = mpg_data.groupby(by="model_year").agg(average_mpg=("mpg", "mean"))
-avg_group.reset_index()
-st.plotly_chart(px.line(data_frame=avg_group, y="average_mpg"))
+
+def average_mpg_by_year():
+    with perf.section("groupby model_year average_mpg", "groupby"):
+        avg_group = cube.agg(
+            "model_year", where=filters.where, average_mpg=("mpg", "mean")
+        )
+    return px.line(data_frame=avg_group, y="average_mpg")
+
+
+perf.plotly_chart(
+    cached_figure("average_mpg_by_year", (filters.key,), average_mpg_by_year),
+    "average_mpg_by_year",
+)
 
 st.markdown(
     "Getting the ***average mpg*** for models that came out each year across all countries shows that there is actually a steady **increase** in the fuel efficiency across the years."
@@ -91,14 +107,15 @@ company_hist.show()
 )
 
 
-def get_first_name(x):
-    full_name = x.split(" ")
-    company = full_name[0]
-    return company
-
-
-mpg_data["company"] = mpg_data["name"].apply(lambda x: get_first_name(x))
-st.plotly_chart(px.histogram(data_frame=mpg_data, x="company"))
+# "company" comes from the derived column registry in data.derived
+perf.plotly_chart(
+    cached_figure(
+        "company_histogram",
+        (filters.key,),
+        lambda: histogram_figure(data_frame=mpg_data, x="company"),
+    ),
+    "company_histogram",
+)
 
 
 show_code(
@@ -111,15 +128,21 @@ country_df.reset_index().sort_values(by="mean_horsepower", ascending=False).head
 """
 )
 
-country_df = mpg_data.groupby("company").agg(mean_mpg=("mpg", "mean"))
-st.dataframe(
-    country_df.reset_index().sort_values(by="mean_mpg", ascending=False).head()
+with perf.section("groupby company mean_mpg", "groupby"):
+    country_df = cube.agg("company", where=filters.where, mean_mpg=("mpg", "mean"))
+perf.dataframe(
+    country_df.reset_index().sort_values(by="mean_mpg", ascending=False).head(),
+    "companies by mpg",
 )
 
 
-country_df = mpg_data.groupby("company").agg(mean_horsepower=("horsepower", "mean"))
-st.dataframe(
-    country_df.reset_index().sort_values(by="mean_horsepower", ascending=False).head()
+with perf.section("groupby company mean_horsepower", "groupby"):
+    country_df = cube.agg(
+        "company", where=filters.where, mean_horsepower=("horsepower", "mean")
+    )
+perf.dataframe(
+    country_df.reset_index().sort_values(by="mean_horsepower", ascending=False).head(),
+    "companies by horsepower",
 )
 
 st.markdown(
@@ -151,35 +174,24 @@ col_names = [
 if "selected" not in st.session_state:
     st.session_state.selected = "mpg"
 
-selected = st.selectbox("Plot a graph of Others vs:", col_names)
-
 
-fig = make_subplots(rows=3, cols=2)
-subplots = [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1), (3, 2)]
+@st.fragment
+def others_vs():
+    selected = st.selectbox("Plot a graph of Others vs:", col_names)
 
-i = 0
-for name in col_names:
-    if selected != name:
-        i = i + 1
-        row, col = subplots[i - 1]
-        graph_name = f"{selected.capitalize()} vs {name.capitalize()}"
-        fig.add_trace(
-            go.Scatter(
-                x=mpg_data[selected],
-                y=mpg_data[name],
-                mode="markers",
-                name=graph_name,
+    perf.plotly_chart(
+        cached_figure(
+            "others_vs",
+            (selected, tuple(col_names), filters.key),
+            lambda: others_vs_figure(
+                mpg_data, selected, col_names, cached=filters.positions is None
             ),
-            row=row,
-            col=col,
-        )
-        fig.update_xaxes(title_text=selected.capitalize(), row=row, col=col)
-        fig.update_yaxes(title_text=name.capitalize(), row=row, col=col)
+        ),
+        "others_vs",
+    )
 
-fig.update_layout(
-    height=720, width=1080, title_text=f"{selected.capitalize()} vs Others"
-)
-st.plotly_chart(fig)
+
+others_vs()
 
 
 st.markdown(
@@ -221,3 +233,5 @@ What we can also see is that newer models have lower horsepower.
 To make more sense out of this we can create a correlation heatmap and perform further multivariate analysis.
 """
 )
+
+perf.finish_page()
@@ -1,37 +1,59 @@
 import streamlit as st
 
-import plotly.express as px
-
-from data.dataframe import mpg_data
-
-st.set_page_config(page_title="Multivariate", page_icon="📈", layout="wide")
-if "expand_code" not in st.session_state:
-    st.session_state.expand_code = False
-
+from components import perf
+from components.filters import sidebar_filters
+from components.page import lazy_import, setup_page
+from components.lazy import lazy_tabs
+from data.correlation import (
+    CORRELATION_METHODS,
+    correlation_matrix,
+    load_correlation,
+)
+from data.cube import load_cube
+from data.derived import mpg_view
+from figures.cache import cached_figure
+from figures.trendline import trendline_traces
 
-def show_code(lines_of_code):
-    with st.expander("See Python Code", expanded=st.session_state.expand_code):
-        st.code(lines_of_code, language="python")
+px = lazy_import("plotly.express")
 
+setup_page("Multivariate", "📈")
 
-with st.sidebar:
-    on = st.toggle("Show Code")
-    if on:
-        st.session_state.expand_code = True
-    else:
-        st.session_state.expand_code = False
+filters = sidebar_filters()
+with perf.section("data load"):
+    mpg_data = filters.apply(mpg_view())
 
 
 st.markdown("# Multivariate Analysis")
 st.markdown("## CORRELATION HEATMAP")
 
 
-correlation = mpg_data.select_dtypes("number").corr("pearson")
-st.plotly_chart(
-    px.imshow(
-        correlation, text_auto=True, color_continuous_scale="thermal", aspect="auto"
+def correlation(method):
+    if filters.positions is None:
+        return load_correlation(method)
+    return correlation_matrix(mpg_data, method)
+
+
+@st.fragment
+def correlation_heatmap():
+    method = st.radio(
+        "Correlation", CORRELATION_METHODS, horizontal=True, key="correlation_method"
     )
-)
+    perf.plotly_chart(
+        cached_figure(
+            "correlation_heatmap",
+            (method, filters.key),
+            lambda: px.imshow(
+                correlation(method),
+                text_auto=True,
+                color_continuous_scale="thermal",
+                aspect="auto",
+            ),
+        ),
+        "correlation_heatmap",
+    )
+
+
+correlation_heatmap()
 
 
 st.markdown(
@@ -47,71 +69,73 @@ Now for a more better understanding, we can take more than two variables in a gr
 """
 )
 
-ins1, ins2, ins3, ins4 = st.tabs(
-    [
-        "🐎hp vs mpg⛽/ year",
-        "🏋️weight vs mpg⛽/ year",
-        "🐎hp vs acclr🏎️/ year",
-        "🏋️weight vs acclr🏎️/ hp",
-    ]
-)
-with ins1:
-    st.plotly_chart(
-        px.scatter(data_frame=mpg_data, x="horsepower", y="mpg", color="model_year")
-    )
-    st.markdown(
-        "From this plot we can confirm that newer models are more efficient than the older ones. However, we can see that the newer models also have lower horsepower."
-    )
-
-with ins2:
-    st.plotly_chart(
-        px.scatter(data_frame=mpg_data, x="weight", y="horsepower", color="model_year")
-    )
-    st.markdown(
+insights = {
+    "🐎hp vs mpg⛽/ year": (
+        ("horsepower", "mpg", "model_year"),
+        {},
+        "From this plot we can confirm that newer models are more efficient than the older ones. However, we can see that the newer models also have lower horsepower.",
+    ),
+    "🏋️weight vs mpg⛽/ year": (
+        ("weight", "horsepower", "model_year"),
+        {},
         """With this graph we find that heavier models are all older models, which also have a lot of horse power. The newer models are not only fuel efficient but are lighter and provide lower power output.
 
-    This raises a questions as why the companies would build such cars with low power and weight but better fuel efficiency?"""
+    This raises a questions as why the companies would build such cars with low power and weight but better fuel efficiency?""",
+    ),
+    "🐎hp vs acclr🏎️/ year": (
+        ("horsepower", "acceleration", "model_year"),
+        {},
+        "This tells us almost all new models have low horse power but high acceleration. Even though there were some older models that had low horsepower/high acceleration.",
+    ),
+    "🏋️weight vs acclr🏎️/ hp": (
+        ("weight", "acceleration", "horsepower"),
+        {"color_continuous_scale": "temps"},
+        "Higher horsepower cars are almost always rather heavy with lower acceleration.",
+    ),
+}
+
+
+def insight_tab(tab):
+    (x, y, color), options, observation = insights[tab]
+    perf.plotly_chart(
+        cached_figure(
+            "multivariate_scatter",
+            (x, y, color, filters.key),
+            lambda: px.scatter(data_frame=mpg_data, x=x, y=y, color=color, **options),
+        ),
+        "multivariate_scatter",
     )
+    st.markdown(observation)
 
-with ins3:
-    st.plotly_chart(
-        px.scatter(
-            data_frame=mpg_data, x="horsepower", y="acceleration", color="model_year"
-        )
-    )
-    st.markdown(
-        "This tells us almost all new models have low horse power but high acceleration. Even though there were some older models that had low horsepower/high acceleration."
-    )
 
-with ins4:
-    st.plotly_chart(
-        px.scatter(
-            data_frame=mpg_data,
-            x="weight",
-            y="acceleration",
-            color="horsepower",
-            color_continuous_scale="temps",
+lazy_tabs(list(insights), insight_tab, key="insight_tab")
+
+
+def cylinders_trend():
+    with perf.section("groupby model_year cylinders", "groupby"):
+        cyl = (
+            load_cube()
+            .agg(
+                "model_year",
+                where=filters.where,
+                avg_no_of_cylinders=("cylinders", "mean"),
+                avg_mpg=("mpg", "mean"),
+            )
+            .reset_index()
         )
+    fig = px.scatter(
+        data_frame=cyl, x="model_year", y="avg_no_of_cylinders", color="avg_mpg"
     )
-    st.markdown(
-        "Higher horsepower cars are almost always rather heavy with lower acceleration."
-    )
+    fig.add_traces(trendline_traces(cyl, "model_year", "avg_no_of_cylinders"))
+    fig.update_layout(showlegend=False)
+    return fig
 
 
-cyl = (
-    mpg_data.groupby("model_year")
-    .aggregate(avg_no_of_cylinders=("cylinders", "mean"), avg_mpg=("mpg", "mean"))
-    .reset_index()
-)
-st.plotly_chart(
-    px.scatter(
-        data_frame=cyl,
-        x="model_year",
-        y="avg_no_of_cylinders",
-        color="avg_mpg",
-        trendline="ols",
-    )
+perf.plotly_chart(
+    cached_figure("cylinders_trend", (filters.key,), cylinders_trend), "cylinders_trend"
 )
 
 
 st.markdown("Newer cars have fewer no of cylinders on average.")
+
+perf.finish_page()
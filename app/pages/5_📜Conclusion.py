@@ -1,6 +1,10 @@
 import streamlit as st
 
-st.set_page_config(page_title="Conclusion", page_icon="📜", layout="wide")
+from components import perf
+from components.page import setup_page
+
+setup_page("Conclusion", "📜", code_toggle=False)
+
 
 st.markdown(
     """
@@ -37,3 +41,5 @@ Checkout my Github: (Github-Chocolatewafer)[https://github.com/chocolatewafer]
 
 """
 )
+
+perf.finish_page()
@@ -1,11 +1,20 @@
 import streamlit as st
 
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from data.dataframe import mpg_data
+from components import perf
+from components.filters import sidebar_filters
+from components.lazy import lazy_section
+from components.page import setup_page
+from data.derived import mpg_view
+from figures.cache import cached_figure
+from figures.matrix import others_vs_figure, scatter_matrix_figure
+from figures.scatter import scatter_figure
+
+setup_page("Playground", "🛝", code_toggle=False)
+
+filters = sidebar_filters()
+with perf.section("data load"):
+    mpg_data = filters.apply(mpg_view())
 
-st.set_page_config(page_title="Playground", page_icon="🛝", layout="wide")
 
 col_names = [
     "mpg",
@@ -18,16 +27,28 @@ col_names = [
 ]
 
 
-ch1, ch2, ch3 = st.columns(spec=[0.3, 0.3, 0.3])
+@st.fragment
+def playground_scatter():
+    ch1, ch2, ch3 = st.columns(spec=[0.3, 0.3, 0.3])
+
+    with ch1:
+        x = st.selectbox("x-axis", col_names)
+    with ch2:
+        y = st.selectbox("y-axis", col_names)
+    with ch3:
+        color = st.selectbox("colour", [None] + col_names)
+
+    perf.plotly_chart(
+        cached_figure(
+            "playground_scatter",
+            (x, y, color, filters.key),
+            lambda: scatter_figure(data_frame=mpg_data, x=x, y=y, color=color),
+        ),
+        "playground_scatter",
+    )
 
-with ch1:
-    x = st.selectbox("x-axis", col_names)
-with ch2:
-    y = st.selectbox("y-axis", col_names)
-with ch3:
-    color = st.selectbox("colour", [None] + col_names)
 
-st.plotly_chart(px.scatter(data_frame=mpg_data, x=x, y=y, color=color))
+playground_scatter()
 
 
 st.markdown("---")
@@ -35,28 +56,44 @@ st.markdown("---")
 if "selected" not in st.session_state:
     st.session_state.selected = "mpg"
 
-selected = st.selectbox("Plot a graph of Others vs:", col_names)
-fig = make_subplots(rows=3, cols=2)
-subplots = [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1), (3, 2)]
-i = 0
-for name in col_names:
-    if selected != name:
-        i = i + 1
-        row, col = subplots[i - 1]
-        graph_name = f"{selected.capitalize()} vs {name.capitalize()}"
-        fig.add_trace(
-            go.Scatter(
-                x=mpg_data[selected],
-                y=mpg_data[name],
-                mode="markers",
-                name=graph_name,
+
+@st.fragment
+def others_vs():
+    selected = st.selectbox("Plot a graph of Others vs:", col_names)
+    perf.plotly_chart(
+        cached_figure(
+            "others_vs",
+            (selected, tuple(col_names), filters.key),
+            lambda: others_vs_figure(
+                mpg_data, selected, col_names, cached=filters.positions is None
             ),
-            row=row,
-            col=col,
-        )
-        fig.update_xaxes(title_text=selected.capitalize(), row=row, col=col)
-        fig.update_yaxes(title_text=name.capitalize(), row=row, col=col)
-fig.update_layout(
-    height=720, width=1080, title_text=f"{selected.capitalize()} vs Others"
-)
-st.plotly_chart(fig)
+        ),
+        "others_vs",
+    )
+
+
+others_vs()
+
+
+def scatter_matrix():
+    columns = st.multiselect(
+        "Columns", col_names, default=col_names, key="scatter_matrix_columns"
+    )
+    if len(columns) < 2:
+        st.info("Pick at least two columns.")
+        return
+    perf.plotly_chart(
+        cached_figure(
+            "scatter_matrix",
+            (tuple(columns), filters.key),
+            lambda: scatter_matrix_figure(
+                mpg_data, columns, cached=filters.positions is None
+            ),
+        ),
+        "scatter_matrix",
+    )
+
+
+lazy_section("Scatter matrix", scatter_matrix, key="scatter_matrix")
+
+perf.finish_page()
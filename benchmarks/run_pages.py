@@ -0,0 +1,201 @@
+"""Headless benchmark of every app page at scaled copies of data/mpg.csv.
+
+Each (page, scale) pair runs in its own process with Streamlit's AppTest: one
+cold run, which includes parsing the csv into a fresh snapshot directory, then
+one rerun. Payload bytes are
+measured in a second, untimed process with the perf log on. Results are
+written as JSON lines so runs from different commits can be compared:
+
+    python benchmarks/run_pages.py --scales 1 100 --output results.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "app"
+SOURCE = ROOT / "data" / "mpg.csv"
+SCALED_DIR = ROOT / "benchmarks" / "data"
+DEFAULT_SCALES = [1, 100, 10_000, 100_000]
+
+
+def pages():
+    return ["data_exploration.py"] + sorted(
+        os.path.relpath(path, APP) for path in glob.glob(str(APP / "pages" / "*.py"))
+    )
+
+
+def scaled_csv(scale, synthetic=False):
+    """data/mpg.csv with its rows repeated scale times, written once and reused.
+
+    With synthetic=True the rows come from data.synthetic instead, so values are
+    not just repeated and group sizes and cardinalities grow the way a real
+    fleet's would.
+    """
+    if scale == 1 and not synthetic:
+        return SOURCE
+    path = SCALED_DIR / f"mpg_{'synthetic_' if synthetic else ''}x{scale}.csv"
+    if path.exists():
+        return path
+    SCALED_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    if synthetic:
+        sys.path.insert(0, str(APP))
+        from data.synthetic import write_csv
+
+        rows = sum(1 for _ in open(SOURCE, encoding="utf-8")) - 1
+        write_csv(partial, rows * scale)
+    else:
+        header, body = SOURCE.read_text(encoding="utf-8").split("\n", 1)
+        body = body if body.endswith("\n") else body + "\n"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(header + "\n")
+            for _ in range(scale):
+                f.write(body)
+    partial.replace(path)
+    return path
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset
+
+
+def run_page(page, timeout, payload=False):
+    """Run inside a worker process; returns this page's measurements.
+
+    Timed runs have the perf panel off, since its instrumentation (serializing
+    every chart, timing imports) would be part of the latency. Payload bytes come
+    from a separate untimed run with MPG_PERF_LOG set.
+    """
+    os.chdir(APP)
+    sys.path.insert(0, str(APP))
+    from streamlit.testing.v1 import AppTest
+
+    def payload_bytes(log, run):
+        events = [json.loads(line) for line in open(log, encoding="utf-8")]
+        return sum(e.get("bytes", 0) for e in events if e["run"] == run)
+
+    result = {"page": page}
+    app = AppTest.from_file(page, default_timeout=timeout)
+    for label in ("cold", "rerun"):
+        started = time.perf_counter()
+        app.run()
+        elapsed = time.perf_counter() - started
+        if payload:
+            run = app.session_state["perf_run"]["run"]
+            result[f"{label}_payload_bytes"] = payload_bytes(
+                os.environ["MPG_PERF_LOG"], run
+            )
+        else:
+            result[f"{label}_seconds"] = elapsed
+        if app.exception:
+            result["exception"] = app.exception[0].message
+            break
+    if not payload:
+        result["peak_rss_bytes"] = peak_rss_bytes()
+    return result
+
+
+def _worker(page, timeout, env, payload=False):
+    command = [sys.executable, __file__, "--worker", page, "--timeout", str(timeout)]
+    worker = subprocess.run(
+        command + (["--payload"] if payload else []),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if worker.returncode != 0:
+        return {"page": page, "exception": worker.stderr.strip().splitlines()[-1:]}
+    return json.loads(worker.stdout.strip().splitlines()[-1])
+
+
+def measure(page, scale, timeout, synthetic=False):
+    data = scaled_csv(scale, synthetic)
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if name not in ("MPG_PERF", "MPG_PERF_LOG")
+    }
+    env.update(MPG_DATA_PATH=str(data), MPG_PERF_MEMORY="0")
+    with tempfile.TemporaryDirectory() as tmp:
+        # An empty snapshot directory, so the cold run always parses the csv
+        env["MPG_SNAPSHOT_DIR"] = str(Path(tmp) / "snapshots")
+        result = _worker(page, timeout, env)
+        result["snapshot"] = "cold"
+        if "exception" in result:
+            return result
+        env["MPG_PERF_LOG"] = str(Path(tmp) / "perf.jsonl")
+        result.update(_worker(page, timeout, env, payload=True))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--pages", nargs="+", help="substrings of page file names")
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="scale with data.synthetic fleets instead of repeated rows",
+    )
+    parser.add_argument("--timeout", type=float, default=3600)
+    parser.add_argument("--output", help="append results here instead of stdout")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--payload", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_page(args.worker, args.timeout, args.payload)))
+        return
+
+    selected = [
+        page
+        for page in pages()
+        if not args.pages or any(name in page for name in args.pages)
+    ]
+    commit = git_commit()
+    rows = sum(1 for _ in open(SOURCE, encoding="utf-8")) - 1
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for scale in args.scales:
+            for page in selected:
+                result = {"commit": commit, "scale": scale, "rows": rows * scale}
+                result["synthetic"] = args.synthetic
+                result.update(measure(page, scale, args.timeout, args.synthetic))
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()